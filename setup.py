@@ -20,4 +20,7 @@ setup(
     zip_safe=False,
     install_requires=[
     ],
+    extras_require={
+        'mysql': ['PyMySQL'],
+    },
 )
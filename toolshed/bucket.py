@@ -1,16 +1,47 @@
 #!/usr/bin/env python
 
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from contextlib import suppress
+from configparser import ConfigParser, Error as ConfigParserError
 from datetime import datetime
-from subprocess import call, CalledProcessError, check_output, STDOUT
+from importlib.util import find_spec
+from subprocess import (
+    CalledProcessError, check_output, DEVNULL, PIPE, Popen
+)
 
 from tool import BaseCommand, CommandError, Tool
 
+import gzip
+import io
 import os
 import shutil
 import sys
+import tarfile
 
 
 class Bucket(Tool):
+    # size of the buffers used when streaming backup data between
+    # processes and files
+    buffer_size = 1024 * 1024
+    # maximum number of tables dumped by a single dump command
+    dump_batch_size = 50
+    # where MySQL and MariaDB packages put the server's unix socket
+    mysql_sockets = (
+        '/var/run/mysqld/mysqld.sock',
+        '/run/mysqld/mysqld.sock',
+        '/var/lib/mysql/mysql.sock',
+        '/tmp/mysql.sock',
+    )
+    # headings of the `mysqldump` sections that belong to a table or view
+    # and which of its files (structure or data) each one is written to
+    mysql_dump_sections = (
+        (b'-- Table structure for table ', 0),
+        (b'-- Dumping data for table ', 1),
+        (b'-- Temporary view structure for view ', 0),
+        (b'-- Temporary table structure for view ', 0),
+        (b'-- Final view structure for view ', 0),
+    )
+
     def __init__(self, backup_path, **options):
         self.backup_path = backup_path
         self.base_path = backup_path
@@ -23,8 +54,11 @@ class Bucket(Tool):
         self.encrypt_key = options.get('encrypt_key', None)
         self.file_group = options.get('file_group', None)
         self.file_owner = options.get('file_owner', None)
+        self.threads = options.get('threads', None) or os.cpu_count() or 1
         self.today = datetime.now()
         self.verbosity = options.get('verbosity', 1)
+        self.date_str = self.today.strftime('%Y-%m-%d')
+        self.dryrun_prefix = 'DryRun: ' if self.dryrun else ''
         self.cmd_auth = []
         if self.db_login_path is not None:
             self.cmd_auth = ['--login-path=' + self.db_login_path]
@@ -33,108 +67,312 @@ class Bucket(Tool):
                 self.cmd_auth = ['--user', self.db_user]
             if self.db_pass is not None:
                 self.cmd_auth.append('--password=' + self.db_pass)
+        if self.db_host != 'localhost':
+            # left off for localhost so the client still uses its socket
+            # (or the host from the login path)
+            self.cmd_auth.append('--host=' + self.db_host)
         self.set_tables(
             options.get('tables_include', None),
             options.get('tables_exclude', None)
         )
 
+    def _add_backup_files(self, tar, jobs=None):
+        """Add the contents of the backup folder to the tar file
+
+        Entries are added relative to the backup folder, the same as
+        running `tar -c *` from within it.
+
+        Arguments:
+            tar {TarFile} -- Open tar file to add the backup files to
+
+        Keyword Arguments:
+            jobs {dict} -- Running dump jobs; when given, the files of
+                           each job are added as soon as it finishes
+                           (default: {None})
+        """
+        if jobs is None:
+            for name in sorted(os.listdir(self.backup_path)):
+                if name[0] == '.':
+                    continue
+                tar.add(os.path.join(self.backup_path, name), arcname=name)
+            return
+        databases = set()
+        for database, filenames in self._finished_dumps(jobs):
+            if database not in databases:
+                tar.add(
+                    os.path.join(self.backup_path, database),
+                    arcname=database,
+                    recursive=False,
+                )
+                databases.add(database)
+            for filename in filenames:
+                tar.add(
+                    filename,
+                    arcname=os.path.relpath(filename, self.backup_path),
+                )
+
     def backup(self):
         """Backup the databse"""
-        self.write('{}Database ({}) backup for ({}) started on: {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            self.database_type,
-            self.db_host,
-            self.today.strftime("%-m/%-d/%Y %H:%M"),
-        ), verbosity=1)
+        started = self.today.strftime('%-m/%-d/%Y %H:%M')
+        self.write(
+            f'{self.dryrun_prefix}Database ({self.database_type}) backup '
+            f'for ({self.db_host}) started on: {started}\n',
+            verbosity=1,
+        )
         self.create_backup_folder()
-        for database, tables in self.tables.items():
-            if self._is_excluded(database):
-                self.write('{}  Skipping database: {}'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    database,
-                ), verbosity=1)
-                continue
-            self.write('{}Backing up database: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                database,
-            ), verbosity=1)
+        for database, tables in self.tables_exclude.items():
+            if not tables:
+                self.write(
+                    f'{self.dryrun_prefix}  Skipping database: {database}',
+                    verbosity=1,
+                )
             for table in tables:
-                if self._is_excluded(database, table):
-                    self.write('{}     Skipping table: {}'.format(
-                        'DryRun: ' if self.dryrun else '',
-                        table,
-                    ), verbosity=1)
-                    continue
-                self.write('{}   Backing up table: {}'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    table,
-                ), verbosity=2)
-                # output the structure
-                self.dump(database, table, structure=True, data=False)
-                # output the data
-                self.dump(database, table, structure=False, data=True)
-        # collapse the folder of backup files into a single file
-        self.collapse()
+                self.write(
+                    f'{self.dryrun_prefix}     Skipping table: '
+                    f'{database}.{table}',
+                    verbosity=1,
+                )
+        # dump the tables of each database in batches, but keep enough
+        # batches to give every thread something to do
+        table_count = sum(len(tables) for tables in self.tables.values())
+        batch_size = max(1, min(
+            self.dump_batch_size,
+            -(-table_count // self.threads),
+        ))
+        jobs = {}
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for database, tables in self.tables.items():
+                self.write(
+                    f'{self.dryrun_prefix}Backing up database: {database}',
+                    verbosity=1,
+                )
+                path = self._database_path(database)
+                for i in range(0, len(tables), batch_size):
+                    batch = tables[i:i + batch_size]
+                    job = executor.submit(
+                        self._dump_tables,
+                        path,
+                        database,
+                        batch,
+                    )
+                    jobs[job] = (database, batch)
+            # collapse the backup files into a single file as they are
+            # dumped
+            try:
+                self.collapse(jobs)
+            except BaseException:
+                # don't wait for the batches that haven't started yet
+                # before reporting the error
+                for job in jobs:
+                    job.cancel()
+                raise
         # output the completion stats
-        self.write('\n{}Backup finished on {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            datetime.now().strftime('%-m/%-d/%Y %H:%M')
-        ), verbosity=1)
+        finished = datetime.now().strftime('%-m/%-d/%Y %H:%M')
+        self.write(
+            f'\n{self.dryrun_prefix}Backup finished on {finished}\n',
+            verbosity=1,
+        )
 
-    def collapse(self):
+    def collapse(self, jobs=None):
         """Collapse the folder of backup files into a single file
 
-        Backup files are collapsed into a gzipped tar file or into a
-        GnuPG encrypted file based on whether or not an encryption key
-        is set.
+        Backup files are collapsed into a tar file or into a GnuPG
+        encrypted file based on whether or not an encryption key is set.
+        The individual backup files are already gzipped so the tar file
+        itself is not compressed.
 
         The resulting file can have it's ownership changed based on
         provided user and group values.
+
+        Keyword Arguments:
+            jobs {dict} -- Running dump jobs (see `backup`) whose files
+                           are collapsed as each job finishes, so the
+                           archiving overlaps with the remaining dumps
+                           (default: {None})
         """
-        cmd = 'tar -cz *'
-        filename = "{}.{}".format(
-            self.today.strftime("%Y-%m-%d"),
-            'bak' if self.encrypt_key else 'tar.gz',
-        )
-        filename = os.path.join(self.base_path, filename)
-        success = True
+        extension = 'bak' if self.encrypt_key else 'tar'
+        filename = os.path.join(self.base_path, f'{self.date_str}.{extension}')
         if self.encrypt_key:
             # encrypt the backup
-            self.write('{}Encrypting backup files into: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                filename,
-            ), verbosity=2)
-            cmd += ' | gpg --output {} --encrypt --recipient {} > /dev/null'.format(  # NOQA
-                filename,
-                self.encrypt_key
+            self.write(
+                f'{self.dryrun_prefix}Encrypting backup files into: '
+                f'{filename}',
+                verbosity=2,
             )
+            cmd = [
+                'gpg',
+                '--batch',
+                '--output', filename,
+                '--encrypt',
+                '--recipient', self.encrypt_key,
+            ]
             if not self.dryrun:
-                call(cmd, shell=True, cwd=self.backup_path)
+                with Popen(cmd,
+                           bufsize=self.buffer_size,
+                           stdin=PIPE,
+                           stdout=DEVNULL) as gpg:
+                    try:
+                        with tarfile.open(fileobj=gpg.stdin,
+                                          mode='w|',
+                                          bufsize=self.buffer_size,
+                                          copybufsize=self.buffer_size) as tar:
+                            self._add_backup_files(tar, jobs)
+                        gpg.stdin.close()
+                    except BrokenPipeError:
+                        # gpg exited early, its return code says why; what
+                        # is still buffered for it can't be written either
+                        with suppress(BrokenPipeError):
+                            gpg.stdin.close()
+                    except CommandError:
+                        gpg.kill()
+                        self._remove_partial(filename)
+                        raise
+                if gpg.returncode != 0:
+                    self._remove_partial(filename)
+                    raise CommandError(
+                        'Encrypting the backup failed (gpg exit code: '
+                        f'{gpg.returncode})'
+                    )
         else:
             # tar the backup files
-            self.write('{}Combine backup files into: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                filename
-            ), verbosity=2)
+            self.write(
+                f'{self.dryrun_prefix}Combine backup files into: {filename}',
+                verbosity=2,
+            )
             if not self.dryrun:
                 try:
-                    with open(filename, 'wb') as out_file:
-                        call(cmd,
-                             shell=True,
-                             stdout=out_file,
-                             cwd=self.backup_path)
-                except CalledProcessError:
-                    success = False
-        if success:
-            # set the permissions and ownerships for files
-            self.file_ownership_permissions([filename, ])
-            # delete the original backup directory
-            self.write('{}Delete the backup folder: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                self.backup_path,
-            ), verbosity=2)
-            if not self.dryrun:
-                shutil.rmtree(self.backup_path)
+                    with tarfile.open(filename,
+                                      'w',
+                                      copybufsize=self.buffer_size) as tar:
+                        self._add_backup_files(tar, jobs)
+                except (OSError, tarfile.TarError) as e:
+                    self._remove_partial(filename)
+                    raise CommandError(
+                        f'Combining the backup files failed: {e}'
+                    )
+                except CommandError:
+                    self._remove_partial(filename)
+                    raise
+        if self.dryrun and jobs is not None:
+            for _ in self._finished_dumps(jobs):
+                pass
+        # delete the original backup directory, before anything else can
+        # fail and leave the (unencrypted) dumps behind
+        self.write(
+            f'{self.dryrun_prefix}Delete the backup folder: '
+            f'{self.backup_path}',
+            verbosity=2,
+        )
+        if not self.dryrun:
+            shutil.rmtree(self.backup_path)
+        # set the permissions and ownerships for files
+        self.file_ownership_permissions([filename, ])
+
+    def _check_dump(self, dump, err_filename):
+        """Check that a dump command succeeded
+
+        The error log is removed when the dump succeeded and kept for
+        reference when it failed.
+
+        Arguments:
+            dump {Popen} -- Finished dump command
+            err_filename {string} -- File the command's errors went to
+
+        Raises:
+            CommandError -- If the dump command failed
+        """
+        if dump.returncode == 0:
+            self._remove_partial(err_filename)
+            return
+        with open(err_filename, 'rb') as err_file:
+            errors = err_file.read().decode(errors='replace').strip()
+        raise CommandError(
+            f'{dump.args[0]} failed (exit code: {dump.returncode}): {errors}'
+        )
+
+    def _connect_mysql(self):
+        """Open a connection to the MySQL server with PyMySQL
+
+        Connection settings not given as options are read from the
+        user's `~/.my.cnf` file, the same as the `mysql` client. Like the
+        client, `localhost` is reached through the server's unix socket
+        rather than over TCP, so the same account and grants apply.
+
+        PyMySQL lets the option file override its arguments while the
+        client does it the other way round, so when the option file sets
+        the host, or credentials that are also given as options, the
+        connection is left to the client.
+
+        Returns:
+            {Connection} -- Open PyMySQL connection, or None if the
+                            `mysql` client has to be used instead
+        """
+        import pymysql
+        options = {}
+        if self.db_user is not None:
+            options['user'] = self.db_user
+        if self.db_pass is not None:
+            options['password'] = self.db_pass
+        option_file = os.path.expanduser(os.path.join('~', '.my.cnf'))
+        client = self._mysql_client_options(option_file)
+        if 'host' in client or set(options) & set(client):
+            return None
+        if os.path.exists(option_file):
+            options['read_default_file'] = option_file
+        if self.db_host == 'localhost':
+            unix_socket = self._mysql_socket(client)
+            if unix_socket is None:
+                return None
+            options['unix_socket'] = unix_socket
+        else:
+            options['host'] = self.db_host
+        return pymysql.connect(**options)
+
+    def _mysql_client_options(self, option_file):
+        """Return the settings in the `[client]` section of an option file
+
+        Arguments:
+            option_file {string} -- Path of the user's MySQL option file
+
+        Returns:
+            {dict} -- Settings (without quotes) keyed by name, with
+                      dashes in the names replaced by underscores
+        """
+        parser = ConfigParser(
+            allow_no_value=True,
+            interpolation=None,
+            strict=False,
+        )
+        try:
+            parser.read(option_file)
+        except ConfigParserError:
+            pass
+        if not parser.has_section('client'):
+            return {}
+        return {
+            name.replace('-', '_'): (value or '').strip('"\'')
+            for name, value in parser.items('client')
+        }
+
+    def _mysql_socket(self, client):
+        """Return the unix socket the `mysql` client uses for localhost
+
+        A socket set in the `[client]` section of the option file is used,
+        otherwise the first of the usual server socket paths that exists.
+
+        Arguments:
+            client {dict} -- Settings of the option file's `[client]`
+                             section (see `_mysql_client_options`)
+
+        Returns:
+            {string} -- Path of the socket, or None if none was found
+        """
+        if client.get('socket'):
+            return client['socket']
+        for path in self.mysql_sockets:
+            if os.path.exists(path):
+                return path
+        return None
 
     def create_backup_folder(self):
         """Create the backup folder to store the backup
@@ -146,22 +384,45 @@ class Bucket(Tool):
             FileExistsError -- If the backup folder for the current date
                                already exists, this exception is raised
         """
-        today = datetime.now()
-        current_folder = today.strftime("%Y-%m-%d")
-        backup_path = os.path.join(self.base_path, current_folder)
-        if os.path.exists(backup_path):
-            raise FileExistsError('Backup path ({}) already exists!'.format(
-                backup_path
-            ))
-        self.write('{}Create the backup folder: {}'.format(
-            'DryRun: ' if self.dryrun else '',
-            backup_path,
-        ), verbosity=3)
-        if not self.dryrun:
-            os.makedirs(backup_path)
+        backup_path = os.path.join(self.base_path, self.date_str)
+        self.write(
+            f'{self.dryrun_prefix}Create the backup folder: {backup_path}',
+            verbosity=3,
+        )
+        try:
+            if self.dryrun:
+                if os.path.exists(backup_path):
+                    raise FileExistsError(backup_path)
+            else:
+                os.makedirs(self.base_path, exist_ok=True)
+                os.mkdir(backup_path)
+        except FileExistsError:
+            raise FileExistsError(
+                f'Backup path ({backup_path}) already exists!'
+            )
         self.backup_path = backup_path
 
-    def dump(self, database, table, structure=False, data=False):
+    def _database_path(self, database):
+        """Create the path for the database files and return it
+
+        Arguments:
+            database {string} -- Database the files are for
+
+        Returns:
+            {string} -- Path to store the database files in
+        """
+        path = os.path.join(self.backup_path, database)
+        if self.verbosity >= 3:
+            self.write(
+                f'{self.dryrun_prefix}       Create database path: {path}',
+                verbosity=3,
+            )
+        if not self.dryrun:
+            os.makedirs(path, exist_ok=True)
+        return path
+
+    def dump(self, database, table, structure=False, data=False,
+             path=None):
         """Database agnostic dump command for table structure and/or data
 
         Arguments:
@@ -172,6 +433,8 @@ class Bucket(Tool):
             structure {bool} -- Dump the database table structure
                                 (default: {False})
             data {bool} -- Dump the database table data (default: {False})
+            path {string} -- Existing path for the database files, created
+                             when not given (default: {None})
 
         Raises:
             NotImplementedError -- raised if the database-specific dump
@@ -180,39 +443,28 @@ class Bucket(Tool):
         if not structure and not data:
             raise ValueError('Must indicate if table structure or table '
                              'data or both are to be dumped')
-        # create a path for the database files and ensure it exists
-        path = os.path.join(self.backup_path, database)
-        if not os.path.exists(path):
-            self.write('{}       Create database path: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                path,
-            ), verbosity=3)
-            if not self.dryrun:
-                os.makedirs(path)
+        if path is None:
+            path = self._database_path(database)
         # determine the filename to use
         backup_content = ''
         if structure and not data:
             backup_content = 'structure'
         elif not structure and data:
             backup_content = 'data'
-        filename = '{}_{}.{}.sql'.format(
-            self.today.strftime('%Y-%m-%d'),
-            table,
-            backup_content
-        )
-        filename = os.path.join(path, filename)
-        cmd = '_dump_{}'.format(self.database_type)
+        filename = self._table_filename(path, table, backup_content)
+        cmd = f'_dump_{self.database_type}'
         try:
-            self.write('{}       Writing {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                backup_content,
-            ), verbosity=3)
+            if self.verbosity >= 3:
+                self.write(
+                    f'{self.dryrun_prefix}       Writing {backup_content}',
+                    verbosity=3,
+                )
             if not self.dryrun:
                 getattr(self, cmd)(filename, database, table, structure, data)
         except AttributeError:
             raise NotImplementedError(
-                'Dump method ({}) for {} database is not '
-                'implemented'.format(cmd, self.database_type)
+                f'Dump method ({cmd}) for {self.database_type} database is '
+                'not implemented'
             )
 
     def _dump_mysql(self, filename, database, table,
@@ -229,17 +481,170 @@ class Bucket(Tool):
                                 (default: {False})
             data {bool} -- Dump the database table data (default: {False})
         """
-        err_filename = os.path.join(self.backup_path, 'errors.log')
+        err_filename = f'{filename}.errors.log'
         cmd = ['mysqldump', ] + self.cmd_auth + ['--skip-opt', ]
         if not structure:
             cmd.append('-t')
         if not data:
             cmd.append('-d')
         cmd += [database, table]
-        with open(filename, 'wb') as dump_file, open(err_filename, 'wb') as err_file:  # NOQA
-            call(cmd, stdout=dump_file, stderr=err_file)
-        if os.path.exists(err_filename):
-            os.remove(err_filename)
+        with self._open_dump_file(filename) as dump_file, \
+                open(err_filename, 'wb') as err_file:
+            dump = Popen(cmd,
+                         bufsize=self.buffer_size,
+                         stdout=PIPE,
+                         stderr=err_file)
+            shutil.copyfileobj(dump.stdout, dump_file, self.buffer_size)
+            dump.stdout.close()
+            dump.wait()
+        self._check_dump(dump, err_filename)
+
+    def dump_full(self, database, tables, path=None):
+        """Database agnostic dump command for table structure and data
+
+        The structure and data of the tables are dumped with a single
+        invocation of the database-specific dump command and then written
+        to separate structure and data files for each table.
+
+        Arguments:
+            database {string} -- Database to dump
+            tables {list} -- Tables to dump
+
+        Keyword Arguments:
+            path {string} -- Existing path for the database files, created
+                             when not given (default: {None})
+
+        Returns:
+            {dict} -- Structure and data filenames for each table, keyed
+                      by table name
+
+        Raises:
+            NotImplementedError -- raised if the database-specific dump
+                                   command isn't implemented
+        """
+        if path is None:
+            path = self._database_path(database)
+        filenames = {}
+        for table in tables:
+            filenames[table] = (
+                self._table_filename(path, table, 'structure'),
+                self._table_filename(path, table, 'data'),
+            )
+        cmd = f'_dump_full_{self.database_type}'
+        try:
+            if self.verbosity >= 3:
+                self.write(
+                    f'{self.dryrun_prefix}       Writing structure and data',
+                    verbosity=3,
+                )
+            if not self.dryrun:
+                getattr(self, cmd)(filenames, database, tables)
+        except AttributeError:
+            raise NotImplementedError(
+                f'Dump method ({cmd}) for {self.database_type} database is '
+                'not implemented'
+            )
+        return filenames
+
+    def _dump_full_mysql(self, filenames, database, tables):
+        """MySQL-specific dump command for table structure and data
+
+        Runs a single `mysqldump` for the tables and splits its output so
+        each table's structure and data go to its own structure and data
+        files. The dump's header and footer are written to every file so
+        each can be loaded on its own.
+
+        Arguments:
+            filenames {dict} -- Structure and data filenames for each
+                                table, keyed by table name
+            database {string} -- Database to dump
+            tables {list} -- Tables to dump
+
+        Raises:
+            CommandError -- If `mysqldump` fails or leaves out any of the
+                            tables; its error log is kept next to the
+                            dump files
+        """
+        err_filename = f'{filenames[tables[0]][1]}.errors.log'
+        cmd = ['mysqldump', ] + self.cmd_auth + ['--skip-opt', database]
+        cmd += tables
+        with open(err_filename, 'wb') as err_file:
+            dump = Popen(cmd,
+                         bufsize=self.buffer_size,
+                         stdout=PIPE,
+                         stderr=err_file)
+            try:
+                written = self._split_mysql_dump(dump.stdout, filenames)
+            except BaseException:
+                # nothing is left to read the dump, so stop it and drop
+                # the files it was being split into
+                dump.kill()
+                for table_filenames in filenames.values():
+                    for filename in table_filenames:
+                        self._remove_partial(filename)
+                raise
+            finally:
+                dump.stdout.close()
+                dump.wait()
+        self._check_dump(dump, err_filename)
+        missing = [table for table in tables if table not in written]
+        if missing:
+            raise CommandError(
+                f'mysqldump did not dump: {", ".join(missing)}'
+            )
+
+    def _dump_tables(self, path, database, tables):
+        """Dump the structure and data of a batch of tables
+
+        Called from a worker thread by `backup` so that multiple batches
+        can be dumped at the same time.
+
+        Arguments:
+            path {string} -- Path to store the database files in
+            database {string} -- Database containing the tables
+            tables {list} -- Tables to dump
+
+        Returns:
+            {dict} -- Structure and data filenames for each table, keyed
+                      by table name
+        """
+        if self.verbosity >= 2:
+            for table in tables:
+                self.write(
+                    f'{self.dryrun_prefix}   Backing up table: '
+                    f'{database}.{table}',
+                    verbosity=2,
+                )
+        return self.dump_full(database, tables, path=path)
+
+    def _finished_dumps(self, jobs):
+        """Wait for the dump jobs and yield the files of each one
+
+        Arguments:
+            jobs {dict} -- Dump job futures mapped to the database and
+                           tables they dump
+
+        Yields:
+            {tuple} -- Database name and the list of files for a finished
+                       job
+
+        Raises:
+            CommandError -- If any of the dump jobs failed
+        """
+        for job in as_completed(jobs):
+            database, tables = jobs[job]
+            try:
+                filenames = job.result()
+            except Exception as e:
+                raise CommandError(
+                    f'Backup of {database} ({", ".join(tables)}) '
+                    f'failed: {e}'
+                )
+            yield database, [
+                filename
+                for table in tables
+                for filename in filenames[table]
+            ]
 
     def get_tables(self):
         """Database agnostic method to get all the databases/tables
@@ -253,13 +658,13 @@ class Bucket(Tool):
             NotImplementedError -- raised if the database-specific get
                                    tables command isn't implemented
         """
-        cmd = '_get_tables_{}'.format(self.database_type)
+        cmd = f'_get_tables_{self.database_type}'
         try:
             return getattr(self, cmd)()
         except AttributeError:
             raise NotImplementedError(
-                'Get tables method ({}) for {} database is not '
-                'implemented'.format(cmd, self.database_type)
+                f'Get tables method ({cmd}) for {self.database_type} '
+                'database is not implemented'
             )
 
     def _get_tables_mysql(self):
@@ -277,52 +682,77 @@ class Bucket(Tool):
             'session_status',
             'session_variables',
         )
-        cmd = ['mysql', ] + self.cmd_auth
-        try:
-            databases_raw = check_output(
-                cmd + ['-e', 'show databases'],
-                stderr=STDOUT
-            ).decode()
-        except CalledProcessError:
-            return results
-        databases = databases_raw.split('\n')
-        for database in databases[1:-1]:
-            if database == 'sys':
-                continue
-            results[database] = []
+        query = (
+            'SELECT table_schema, table_name '
+            'FROM information_schema.tables '
+            'ORDER BY table_schema, table_name'
+        )
+        rows = None
+        if self.db_login_path is None and find_spec('pymysql') is not None:
+            # query the server directly rather than starting a client
+            import pymysql
+            try:
+                conn = self._connect_mysql()
+                if conn is not None:
+                    with conn, conn.cursor() as cursor:
+                        cursor.execute(query)
+                        rows = cursor.fetchall()
+            except pymysql.MySQLError:
+                rows = None
+        if rows is None:
+            cmd = ['mysql', ] + self.cmd_auth + [
+                '--batch',
+                '--skip-column-names',
+                '-e',
+                query,
+            ]
             try:
-                tables_raw = check_output(
-                    cmd + [database, '-e', 'show tables'],
-                    stderr=STDOUT
-                ).decode()
+                tables_raw = check_output(cmd, stderr=DEVNULL).decode()
             except CalledProcessError:
-                del results[database]
-            else:
-                tables = tables_raw.split('\n')
-                for table in tables[1:-1]:
-                    if table[:10] == 'Tables_in_':
-                        continue
-                    if table.lower() in exclude_tables:
-                        continue
-                    results[database].append(table)
+                return results
+            rows = (
+                line.split('\t', 1)
+                for line in tables_raw.splitlines()
+                if line
+            )
+        for database, table in rows:
+            if database == 'sys':
+                continue
+            if table.lower() in exclude_tables:
+                continue
+            results.setdefault(database, []).append(table)
         return results
 
-    def _is_excluded(self, database, table=None):
-        """Indicates if the database/table is excluded from the backup
+    def _open_dump_file(self, filename, mode='wb'):
+        """Open a gzipped dump file for writing
+
+        Writes are collected in a `self.buffer_size` buffer so the
+        compressor and the file system see a few large writes rather
+        than one per line of the dump.
 
         Arguments:
-            database {string} -- The database name to check
-            table {string} -- The table name to check
+            filename {string} -- Filename for the dump file
+
+        Keyword Arguments:
+            mode {string} -- Mode to open the file with; `ab` adds to an
+                             existing dump file (default: {'wb'})
 
         Returns:
-            bool -- Whether or not the database/table is to be
-                    excluded from the backup
+            {file} -- Buffered binary file object
         """
-        if database in self.tables_exclude.keys():
-            if table is None:
-                return not self.tables_exclude[database]
-            else:
-                return table in self.tables_exclude[database]
+        return io.BufferedWriter(
+            gzip.open(filename, mode),
+            buffer_size=self.buffer_size,
+        )
+
+    def _remove_partial(self, filename):
+        """Remove a partially written backup file
+
+        Arguments:
+            filename {string} -- Backup file to remove
+        """
+        if os.path.exists(filename):
+            os.remove(filename)
 
     def set_tables(self, tables_include, tables_exclude):
         """Set the databases/tables to backup
@@ -338,7 +768,7 @@ class Bucket(Tool):
         if tables_include:
             for entry in tables_include:
                 database, table = entry.split('.', 1)
-                if database not in self.tables.keys():
+                if database not in self.tables:
                     self.tables[database] = []
                 self.tables[database].append(table)
         else:
@@ -347,10 +777,152 @@ class Bucket(Tool):
         if tables_exclude:
             for entry in tables_exclude:
                 database, table = entry.split('.', 1)
-                if database not in self.tables_exclude.keys():
+                if database not in self.tables_exclude:
                     self.tables_exclude[database] = []
                 if table != '*':
                     self.tables_exclude[database].append(table)
+        # prune the excluded databases/tables up front so `backup` has
+        # nothing left to filter
+        for database, tables in self.tables_exclude.items():
+            if not tables:
+                self.tables.pop(database, None)
+                continue
+            for table in tables:
+                try:
+                    self.tables.get(database, []).remove(table)
+                except ValueError:
+                    pass
+            if database in self.tables and not self.tables[database]:
+                del self.tables[database]
+
+    def _split_mysql_dump(self, stream, filenames):
+        """Split the output of `mysqldump` into structure and data files
+
+        Everything before the first section of the dump is a header and
+        everything from where the dump starts restoring the settings the
+        header saved is a footer; both are written to every file. Each
+        table's structure section goes to its structure file and its data
+        section (followed by its triggers) goes to its data file. A view
+        has a temporary and a final structure section, both of which go
+        to its structure file, and no data.
+
+        Only the files of the table being read are open at any one time,
+        so the files of a view are reopened for its final structure and
+        the footer is appended to the files (as an additional gzip
+        member) once the end of the dump is reached.
+
+        Arguments:
+            stream {file} -- Binary output of `mysqldump`
+            filenames {dict} -- Structure and data filenames for each
+                                table in the dump, keyed by table name
+
+        Returns:
+            {list} -- Tables (and views) that were found in the dump
+
+        Raises:
+            CommandError -- If the dump has a table that is not in
+                            `filenames`
+        """
+        header = []
+        footer = []
+        write = header.append
+        in_footer = False
+        table = None
+        table_files = ()
+        written = []
+        pending = None
+        try:
+            for line in stream:
+                if in_footer:
+                    pass
+                elif table is not None and self._mysql_dump_footer(line):
+                    write = footer.append
+                    in_footer = True
+                elif line.startswith(b'-- '):
+                    for marker, section in self.mysql_dump_sections:
+                        if not line.startswith(marker):
+                            continue
+                        name = line[len(marker):].strip().strip(b'`')
+                        name = name.replace(b'``', b'`').decode()
+                        if name not in filenames:
+                            raise CommandError(
+                                f'mysqldump dumped an unexpected table: {name}'
+                            )
+                        if name != table:
+                            for table_file in table_files:
+                                table_file.close()
+                            table_files = ()
+                            table = name
+                            if table in written:
+                                table_files = tuple(
+                                    self._open_dump_file(filename, 'ab')
+                                    for filename in filenames[table]
+                                )
+                            else:
+                                table_files = tuple(
+                                    self._open_dump_file(filename)
+                                    for filename in filenames[table]
+                                )
+                                written.append(table)
+                                for table_file in table_files:
+                                    table_file.write(b''.join(header))
+                        write = table_files[section].write
+                        break
+                # section headings are wrapped in `--` lines so hold on
+                # to them until it is known where they belong
+                if pending is not None:
+                    write(pending)
+                    pending = None
+                if line == b'--\n' and not in_footer:
+                    pending = line
+                    continue
+                write(line)
+        finally:
+            for table_file in table_files:
+                table_file.close()
+        if pending is not None:
+            footer.append(pending)
+        footer = b''.join(footer)
+        for table in written:
+            for filename in filenames[table]:
+                with gzip.open(filename, 'ab') as table_file:
+                    table_file.write(footer)
+        return written
+
+    def _mysql_dump_footer(self, line):
+        """Return whether `line` is the start of a `mysqldump` footer
+
+        The footer restores the settings saved by the header (e.g.
+        `SET TIME_ZONE=@OLD_TIME_ZONE`) and ends with a `-- Dump
+        completed` comment. Trigger and view definitions only ever
+        restore their own `@saved_...` settings.
+
+        Arguments:
+            line {bytes} -- Line of the dump
+
+        Returns:
+            {bool} -- Whether the line starts the footer
+        """
+        if line.startswith(b'-- Dump completed'):
+            return True
+        if not (line.startswith(b'/*!') or line.startswith(b'SET ')):
+            return False
+        return b'=@OLD_' in line or b'= @MYSQLDUMP_TEMP_LOG_BIN' in line
+
+    def _table_filename(self, path, table, backup_content):
+        """Return the full filename for a table's backup file
+
+        Arguments:
+            path {string} -- Path to the database files
+            table {string} -- Table the file is for
+            backup_content {string} -- What the file contains
+                                       (i.e., structure or data)
+
+        Returns:
+            {string} -- Full filename for the backup file
+        """
+        filename = f'{self.date_str}_{table}.{backup_content}.sql.gz'
+        return os.path.join(path, filename)
 
 
 class Command(BaseCommand):
@@ -361,7 +933,8 @@ class Command(BaseCommand):
         parser.add_argument(
             'backup_path',
             action='store',
-            help='Path to store backup files',
+            help='Path to store the backup file (YYYY-MM-DD.tar, or '
+                 'YYYY-MM-DD.bak when encrypted) in',
         )
         parser.add_argument(
             '-e', '--encryptkey',
@@ -414,7 +987,8 @@ class Command(BaseCommand):
             action='store',
             default=None,
             dest='file_owner',
-            help='Unix user who should own the backup files',
+            help='Unix user (or user:group) who should own the backup '
+                 'files',
         )
         parser.add_argument(
             '-p', '--password',
@@ -424,6 +998,15 @@ class Command(BaseCommand):
             help="Used in conjunction with --user to specify "
                  "the user's password",
         )
+        parser.add_argument(
+            '-T', '--threads',
+            action='store',
+            default=None,
+            dest='threads',
+            help='Number of tables to back up at the same time '
+                 '(default: number of CPUs)',
+            type=int,
+        )
         parser.add_argument(
             '-t', '--type',
             action='store',
@@ -1,16 +1,61 @@
 #!/usr/bin/env python
 
-from collections import OrderedDict
-from datetime import datetime, timedelta
+from calendar import monthrange
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from threading import local
 
 from tool import BaseCommand, CommandError, Tool
 
+import heapq
 import os
+import re
 import shutil
 import sys
 
 
+@lru_cache(maxsize=256)
+def _last_day_of_month(year, month):
+    """Return the last day of the `month` in `year`
+
+    Cached since backup files in the same month all need the same answer.
+
+    Arguments:
+        year {integer} -- Year of the month
+        month {integer} -- Month (1-12)
+
+    Returns:
+        {integer} -- Day number of the last day of the month
+    """
+    return monthrange(year, month)[1]
+
+
+def _timestamp(moment):
+    """Return `moment` as M/D/YYYY HH:MM for the output
+
+    Built from the date's fields since the `%-m` and `%-d` strftime
+    directives are not available on every platform.
+
+    Arguments:
+        moment {datetime} -- Date and time to format
+
+    Returns:
+        {string} -- Formatted date and time
+    """
+    return f'{moment.month}/{moment.day}/{moment.year} {moment:%H:%M}'
+
+
 class Shears(Tool):
+    # bit set by `_boundary_bits` for the end of each timeframe
+    boundary_bits = {
+        'weekly': 1,
+        'monthly': 2,
+        'yearly': 4,
+    }
+    # YYYY-MM-DD at the start of a filename, optionally followed by _
+    date_pattern = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})(?:_|\Z)')
+
     def __init__(self, backup_path, file_extensions, **options):
         """Backup file pruning tool
 
@@ -20,10 +65,14 @@ class Shears(Tool):
                                       files to prune
             **options {dict} -- additional pruning options
         """
-        self.backup_levels = OrderedDict()
+        self._backup_dates = {}
+        self.backup_levels = {}
         self.backup_path = backup_path
         self.dryrun = options.get('dryrun', False)
-        self.file_extensions = []
+        self.dryrun_prefix = 'DryRun: ' if self.dryrun else ''
+        # keep the extensions in the order given (without duplicates) so
+        # the levels are pruned in a predictable order
+        extensions = {}
         for ext in file_extensions:
             ext = ext.strip()
             try:
@@ -32,11 +81,16 @@ class Shears(Tool):
             except IndexError:
                 pass
             else:
-                self.file_extensions.append(ext)
+                extensions[ext] = None
+        self.file_extensions = tuple(extensions)
         self.folders = options.get('folders', False)
-        if self.folders and not self.file_extensions:
-            self.file_extensions = ['']
+        if self.folders:
+            # dated folders are pruned as a group of their own, with no
+            # extension, next to the files of each extension
+            self.file_extensions += ('', )
         self.limit = options.get('limit', None)
+        self.parallel = options.get('parallel', None) or 1
+        self._output = local()
         self.today = datetime.now()
         self.verbosity = options.get('verbosity', 1)
 
@@ -61,6 +115,70 @@ class Shears(Tool):
                 'limit': days,
                 'path': os.path.join(self.backup_path, level),
             }
+        # the levels above each level (lowest first) that its files can
+        # move up to along with their path and boundary bit
+        levels = list(self.backup_levels.keys())
+        self._higher_levels = {
+            level: tuple(
+                (
+                    new_level,
+                    self.backup_levels[new_level]['path'],
+                    self.boundary_bits.get(new_level, 0),
+                )
+                for new_level in levels[index + 1:]
+            )
+            for index, level in enumerate(levels)
+        }
+
+    def _accept(self, entry, file_extensions):
+        """Classify a directory entry as a backup to consider or not
+
+        Arguments:
+            entry {DirEntry} -- Directory entry to classify
+            file_extensions {dict} -- Extensions of backup files
+
+        Returns:
+            {tuple} -- The backup's name without the extension and its
+                       extension (or None and the reason the entry isn't
+                       a backup)
+        """
+        # don't follow symlinks so the entry type comes straight from
+        # the directory listing
+        if entry.is_file(follow_symlinks=False):
+            # the extension is everything after the first `.`
+            filename, dot, extension = entry.name.partition('.')
+            if not extension or extension not in file_extensions:
+                extensions = ', *.'.join(filter(None, file_extensions))
+                return None, f'not *.{extensions} file'
+        elif self.folders and entry.is_dir(follow_symlinks=False):
+            filename = entry.name
+            extension = ''
+        else:
+            return None, 'not a folder' if self.folders else 'not a file'
+        if self.get_backup_date(filename) is None:
+            return None, 'no date in filename'
+        return filename, extension
+
+    def _boundary_bits(self, file_date):
+        """Return the timeframes that end on `file_date` as bits
+
+        Arguments:
+            file_date {datetime} -- Date of a backup file
+
+        Returns:
+            {integer} -- `boundary_bits` values of every timeframe
+                         that `file_date` is the end of OR'd together
+        """
+        bits = 0
+        # Saturday (5) is considered the end of the week
+        if file_date.weekday() == 5:
+            bits |= self.boundary_bits['weekly']
+        year, month = file_date.year, file_date.month
+        if file_date.day == _last_day_of_month(year, month):
+            bits |= self.boundary_bits['monthly']
+            if month == 12:
+                bits |= self.boundary_bits['yearly']
+        return bits
 
     def delete(self, filename, extension, path):
         """Delete existing backup file
@@ -71,15 +189,17 @@ class Shears(Tool):
             extension {string} -- Extension for the backup file
             path {string} -- Path to the backup file
         """
-        if not self.folders:
-            filename = '{}.{}'.format(filename, extension)
-        filename = os.path.join(path, filename)
-        self.write('{}        Deleting {}'.format(
-            'DryRun: ' if self.dryrun else '',
-            filename,
-        ), verbosity=3)
+        if extension:
+            filename = f'{filename}.{extension}'
+        # `path` is always a directory and `filename` a plain name so
+        # skip the extra work `os.path.join` does
+        filename = f'{path}{os.sep}{filename}'
+        self.write(
+            f'{self.dryrun_prefix}        Deleting {filename}',
+            verbosity=3,
+        )
         if not self.dryrun:
-            if self.folders:
+            if not extension:
                 shutil.rmtree(filename)
             else:
                 os.remove(filename)
@@ -104,103 +224,119 @@ class Shears(Tool):
                           or None if filename doesn't translate to a date
         """
         try:
-            file_date, file_description = filename.split('_', 1)
-        except ValueError:
-            file_date = filename
+            return self._backup_dates[filename]
+        except KeyError:
+            pass
+        self._backup_dates[filename] = self._parse_backup_date(filename)
+        return self._backup_dates[filename]
+
+    def _parse_backup_date(self, filename):
+        """Returns datetime object for the YYYY-MM-DD date in `filename`
+
+        Arguments:
+            filename {string} -- backup filename without the extension
+
+        Returns:
+            {datetime} -- datetime object for the date or None if
+                          `filename` doesn't start with a valid date
+        """
+        # the date has a fixed layout so match it with a compiled
+        # pattern rather than paying for `strptime` on every file
+        match = self.date_pattern.match(filename)
+        if match is None:
+            return None
         try:
-            return datetime.strptime(file_date, "%Y-%m-%d")
+            return datetime(*(int(part) for part in match.groups()))
         except ValueError:
             return None
 
-    def get_directory_files(self, path, file_extension):
+    def get_directory_files(self, path, file_extension, sort=True):
         """Return sorted list of files in `path` with `file_extension`
 
         Arguments:
             path {object} -- Path to the files in the backup level
             file_extension {string} -- Extension of backup files to prune
 
+        Keyword Arguments:
+            sort {bool} -- Sort the files; callers that only need the
+                           oldest few can skip it (default: {True})
+
         Returns:
             list -- List of storted files in the path
         """
-        self.write('{}    Obtain the existing backup files'.format(
-            'DryRun: ' if self.dryrun else '',
-        ), verbosity=2)
-        files = []
-        for item in os.listdir(path):
-            if not os.path.isfile(os.path.join(path, item)):
-                if not self.folders:
-                    self.write('{}        Skipping {}: not a file'.format(
-                        'DryRun: ' if self.dryrun else '',
-                        os.path.join(path, item),
-                    ), verbosity=3)
-                    continue
+        files = self.get_directory_backups(path, [file_extension, ])
+        files = files[file_extension]
+        if sort:
+            files.sort()
+        return files
+
+    def get_directory_backups(self, path, file_extensions):
+        """Return the backups in `path` for each of the `file_extensions`
+
+        The directory is only read once no matter how many extensions
+        are being pruned.
+
+        Arguments:
+            path {object} -- Path to the files in the backup level
+            file_extensions {list} -- Extensions of backup files to prune
+
+        Returns:
+            dict -- Unsorted list of the backup files (without the
+                    extension) in the path for each extension
+        """
+        self.write(
+            f'{self.dryrun_prefix}    Obtain the existing backup files',
+            verbosity=2,
+        )
+        files = {extension: [] for extension in file_extensions}
+        for filename, extension in self._iter_valid_entries(path, files):
+            files[extension].append(filename)
+        return files
+
+    def _iter_valid_entries(self, path, file_extensions):
+        """Yield the backup files in `path` to consider
 
-                if self.get_backup_date(item) is None:
+        Arguments:
+            path {object} -- Path to the files in the backup level
+            file_extensions {dict} -- Extensions of backup files to prune
+
+        Yields:
+            {tuple} -- Backup file (or folder) name without the extension
+                       and its extension
+        """
+        verbose = self.verbosity >= 3
+        with os.scandir(path) as entries:
+            for entry in entries:
+                filename, extension = self._accept(entry, file_extensions)
+                if filename is None:
+                    if verbose:
+                        self.write(
+                            f'{self.dryrun_prefix}        Skipping '
+                            f'{entry.path}: {extension}',
+                            verbosity=3,
+                        )
+                    continue
+                if verbose:
                     self.write(
-                        '{}        Skipping {}: no date in filename'.format(
-                            'DryRun: ' if self.dryrun else '',
-                            os.path.join(path, item),
-                        ),
-                        verbosity=3
+                        f'{self.dryrun_prefix}        Keeping {entry.path}',
+                        verbosity=3,
                     )
-                else:
-                    self.write('{}        Keeping {}'.format(
-                        'DryRun: ' if self.dryrun else '',
-                        os.path.join(path, item),
-                    ), verbosity=3)
-                    files.append(item)
-                continue
-            filename, extension = item.split('.', 1)
-            if extension != file_extension:
-                self.write('{}        Skipping {}: not *.{} file'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    os.path.join(path, item),
-                    file_extension,
-                ), verbosity=3)
-                continue
-            if self.get_backup_date(filename) is None:
-                self.write('{}        Skipping {}: no date in filename'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    os.path.join(path, item),
-                ), verbosity=3)
-                continue
-            else:
-                self.write('{}        Keeping {}'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    os.path.join(path, item),
-                ), verbosity=3)
-                files.append(filename)
-        files.sort()
-        return files
+                yield filename, extension
 
-    def is_end_of(self, timeframe, filename):
-        """Is the `filename` at the end of the `timeframe`
+    def is_end_of(self, timeframe, file_date):
+        """Is the `file_date` at the end of the `timeframe`
 
         Arguments:
             timeframe {string} -- Period of time being checked (i.e., weekly)
-            filename {string} -- Backup file's name without extension
-                                 in the format YYYY-MM-DD_extra_text
+            file_date {datetime} -- Date of the backup file (see
+                                    `get_backup_date`)
 
         Returns:
-            {boolean} -- If the date of the filename is at the end of the
+            {boolean} -- If the date of the file is at the end of the
                          timeframe
         """
-        file_date = self.get_backup_date(filename)
-        year = int(file_date.strftime('%Y'))
-        if timeframe == 'weekly':
-            # Saturday (6) is considered the end of the week
-            return file_date.strftime('%w') == '6'
-        elif timeframe == 'monthly':
-            month = int(file_date.strftime('%-m')) + 1
-            if month == 13:
-                year += 1
-                month = 1
-            test_date = datetime(year, month, 1) - timedelta(days=1)
-            return file_date == test_date
-        elif timeframe == 'yearly':
-            test_date = datetime(year, 12, 31)
-            return file_date == test_date
-        return False
+        bits = self._boundary_bits(file_date)
+        return bool(bits & self.boundary_bits.get(timeframe, 0))
 
     def move(self, filename, extension, path, new_path):
         """Move backup file to a new level
@@ -212,46 +348,112 @@ class Shears(Tool):
             path {string} -- Path to the backup file
             new_path {string} -- Path where the backup file is going
         """
-        if not self.folders:
-            filename = '{}.{}'.format(filename, extension)
-        src = os.path.join(path, filename)
-        dest = os.path.join(new_path, filename)
-        self.write('{}        Renaming {} to {}'.format(
-            'DryRun: ' if self.dryrun else '',
-            src,
-            dest,
-        ), verbosity=3)
+        if extension:
+            filename = f'{filename}.{extension}'
+        src = f'{path}{os.sep}{filename}'
+        dest = f'{new_path}{os.sep}{filename}'
+        self.write(
+            f'{self.dryrun_prefix}        Renaming {src} to {dest}',
+            verbosity=3,
+        )
         if not self.dryrun:
             os.rename(src, dest)
 
     def prune(self):
         """Starting point to prune backups at all levels"""
-        self.write('{}Pruning backups in ({}) started on: {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            self.backup_path,
-            self.today.strftime('%-m/%-d/%Y %H:%M'),
-        ), verbosity=1)
+        self.write(
+            f'{self.dryrun_prefix}Pruning backups in ({self.backup_path}) '
+            f'started on: {_timestamp(self.today)}\n',
+            verbosity=1,
+        )
 
         if self.limit is not None:
-            for extension in self.file_extensions:
-                self.prune_limit(extension, self.backup_path, self.limit)
+            files = self.get_directory_backups(
+                self.backup_path,
+                self.file_extensions,
+            )
+            self._run_prune_tasks([
+                (
+                    self.prune_limit,
+                    extension,
+                    self.backup_path,
+                    self.limit,
+                    backup_files,
+                )
+                for extension, backup_files in files.items()
+            ])
         else:
+            # levels are pruned in order since files move up the levels
+            # but the extensions within a level are independent
             for level, details in self.backup_levels.items():
-                for extension in self.file_extensions:
-                    self.prune_level(
+                files = self.get_directory_backups(
+                    details['path'],
+                    self.file_extensions,
+                )
+                self._run_prune_tasks([
+                    (
+                        self.prune_level,
                         extension,
                         level,
                         details['path'],
-                        details['limit']
+                        details['limit'],
+                        backup_files,
                     )
+                    for extension, backup_files in files.items()
+                ])
 
         # output the completion stats
-        self.write('\n{}Pruning finished on {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            datetime.now().strftime('%-m/%-d/%Y %H:%M'),
-        ), verbosity=1)
+        finished = _timestamp(datetime.now())
+        self.write(
+            f'\n{self.dryrun_prefix}Pruning finished on {finished}\n',
+            verbosity=1,
+        )
+
+    def _run_buffered(self, method, *args):
+        """Run a prune task with its output written in one go
+
+        The messages of the task are collected while it runs and written
+        with a single write once it is done rather than line by line,
+        which also keeps the output of parallel tasks from interleaving.
+
+        Arguments:
+            method {method} -- Prune method to run
+            *args {list} -- Arguments for `method`
+        """
+        self._output.lines = []
+        try:
+            method(*args)
+        finally:
+            lines = self._output.lines
+            self._output.lines = None
+            if lines:
+                with self.write_lock:
+                    sys.stdout.write(''.join(lines))
+                    sys.stdout.flush()
+
+    def _run_prune_tasks(self, tasks):
+        """Run the prune tasks, `self.parallel` at a time
+
+        Each task is a tuple of the prune method and its arguments.
 
-    def prune_level(self, file_extension, level, path, limit):
+        Arguments:
+            tasks {list} -- Prune tasks to run
+        """
+        if self.parallel <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                self._run_buffered(*task)
+            return
+
+        workers = min(self.parallel, len(tasks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            jobs = [
+                executor.submit(self._run_buffered, *task) for task in tasks
+            ]
+            for job in jobs:
+                job.result()
+
+    def prune_level(self, file_extension, level, path, limit,
+                    backup_files=None):
         """Prune the files at one backup level
 
         Arguments:
@@ -260,82 +462,119 @@ class Shears(Tool):
             path {object} -- Path to the files in the backup level
             limit {integer} -- Number of days worth of backups to keep
                                for this backup level
+
+        Keyword Arguments:
+            backup_files {list} -- Backup files already read from `path`
+                                   (default: {None})
         """
-        dryrun = 'DryRun: ' if self.dryrun else ''
-        msg = f'{dryrun}Prune {level} '
-        if self.folders:
-            msg += f'folders '
-        else:
+        msg = f'{self.dryrun_prefix}Prune {level} '
+        if file_extension:
             msg += f'*.{file_extension} files '
+        else:
+            msg += 'folders '
         msg += f'({limit} max)'
         self.write(msg, verbosity=1)
 
         # read the valid backup files from `path`
-        backup_files = self.get_directory_files(path, file_extension)
-
-        # identify the files to remove
-        remove_files = []
-        while len(backup_files) > limit:
-            remove_files.append(backup_files.pop(0))
+        if backup_files is None:
+            backup_files = self.get_directory_files(
+                path,
+                file_extension,
+                sort=False,
+            )
+
+        # identify the files to remove (the oldest, oldest first)
+        remove_files = heapq.nsmallest(
+            max(0, len(backup_files) - limit),
+            backup_files,
+        )
 
         # remove the files for this level
-        levels = list(self.backup_levels.keys())
-        level_index = levels.index(level)
+        higher_levels = self._higher_levels[level]
         for backup_file in remove_files:
             moved = False
-            for new_level in levels[level_index + 1:]:
-                if self.is_end_of(new_level, backup_file):
-                    self.write('{}    Moving {}/{} to {}'.format(
-                        'DryRun: ' if self.dryrun else '',
-                        level,
-                        backup_file,
-                        new_level
-                    ), verbosity=1)
-                    new_path = self.backup_levels[new_level]['path']
+            bits = self._boundary_bits(self.get_backup_date(backup_file))
+            for new_level, new_path, new_bit in higher_levels:
+                if bits & new_bit:
+                    self.write(
+                        f'{self.dryrun_prefix}    Moving {level}/'
+                        f'{backup_file} to {new_level}',
+                        verbosity=1,
+                    )
                     self.move(backup_file, file_extension, path, new_path)
                     moved = True
                     break
             if not moved:
-                self.write('{}    Removing {}/{}'.format(
-                    'DryRun: ' if self.dryrun else '',
-                    level,
-                    backup_file
-                ), verbosity=1)
+                self.write(
+                    f'{self.dryrun_prefix}    Removing {level}/{backup_file}',
+                    verbosity=1,
+                )
                 self.delete(backup_file, file_extension, path)
 
-    def prune_limit(self, file_extension, path, limit):
+    def prune_limit(self, file_extension, path, limit, backup_files=None):
         """Prune the `file_extension` files in `path` to `limit` files
 
         Arguments:
             file_extension {string} -- Extension of backup files to prune
             path {object} -- Path to the files to prune
             limit {integer} -- Number of files to keep
+
+        Keyword Arguments:
+            backup_files {list} -- Backup files already read from `path`
+                                   (default: {None})
         """
-        dryrun = 'DryRun: ' if self.dryrun else ''
-        msg = f'{dryrun}Prune '
-        if self.folders:
-            msg += f'folders '
-        else:
+        msg = f'{self.dryrun_prefix}Prune '
+        if file_extension:
             msg += f'*.{file_extension} files '
+        else:
+            msg += 'folders '
         msg += f'({limit} max)'
         self.write(msg, verbosity=1)
 
         # read the valid backup files from `path`
-        backup_files = self.get_directory_files(path, file_extension)
-
-        # identify the files to remove
-        remove_files = []
-        while len(backup_files) > limit:
-            remove_files.append(backup_files.pop(0))
+        if backup_files is None:
+            backup_files = self.get_directory_files(
+                path,
+                file_extension,
+                sort=False,
+            )
+
+        # identify the files to remove (the oldest, oldest first)
+        remove_files = heapq.nsmallest(
+            max(0, len(backup_files) - limit),
+            backup_files,
+        )
 
         # remove the files
         for backup_file in remove_files:
-            self.write('{}    Removing {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                backup_file
-            ), verbosity=1)
+            self.write(
+                f'{self.dryrun_prefix}    Removing {backup_file}',
+                verbosity=1,
+            )
             self.delete(backup_file, file_extension, path)
 
+    def write(self, msg, end='\n', verbosity=1):
+        """Output text to standard output
+
+        Messages written while a prune task is running (see
+        `_run_buffered`) are collected rather than output directly.
+
+        Arguments:
+            msg {string} -- Message to be output
+
+        Keyword Arguments:
+            end {string} -- String ending character to be used rather than
+                            a carriage return (default: {'\n'})
+            verbosity {integer} -- What verbosity level the tool must
+                                   be running at for the message to be
+                                   output (default: {1})
+        """
+        lines = getattr(self._output, 'lines', None)
+        if lines is None:
+            super().write(msg, end=end, verbosity=verbosity)
+        elif self.verbosity >= verbosity:
+            lines.append(msg + end)
+
 
 class Command(BaseCommand):
     help = 'Backup file pruning tool'
@@ -394,6 +633,15 @@ class Command(BaseCommand):
             help='Number of files to keep in the backup path (no levels)',
             type=int,
         )
+        parser.add_argument(
+            '--parallel',
+            action='store',
+            default=1,
+            dest='parallel',
+            help='Number of file extensions to prune at the same time '
+                 '(default: 1)',
+            type=int,
+        )
 
     def handle(self, *args, **options):
         backup_path = options.pop('backup_path')
@@ -1,18 +1,62 @@
-from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
 from toolshed.shears import Shears
 
 import os
 import shutil
+import tempfile
 import unittest
-import uuid
+
+
+# the test files are created in RAM backed storage (/dev/shm) where it
+# exists, otherwise the system's temporary directory, unless
+# SHEARS_TEST_TMPDIR points somewhere else
+TMP_DIR = os.environ.get('SHEARS_TEST_TMPDIR') or None
+if TMP_DIR is None and os.access('/dev/shm', os.W_OK):
+    TMP_DIR = '/dev/shm'
+
+# the files created in every backup folder by `create_folders`
+FOLDER_FILES = ('test.bak', 'test.log', 'test.tar.gz', 'test.zip')
 
 
 class TestShears(unittest.TestCase):
 
-    def create_files(self, start_date, num_files, extension, name_suffix=''):
+    def assertFilesEqual(self, path, expected, msg=None):
+        """Fail if the contents of `path` are not the `expected` names
+
+        The names are compared as sets so neither side needs sorting.
+
+        Arguments:
+            path {string} -- Directory to check
+            expected {list} -- Names that should be in the directory
+
+        Keyword Arguments:
+            msg {string} -- Message to use on failure (Default: None)
+        """
+        with os.scandir(path) as entries:
+            names = {entry.name for entry in entries}
+        self.assertSetEqual(names, set(expected), msg=msg)
+
+    def prune(self, file_extensions, **options):
+        """Prune `self.tmp_path` quietly with the `options`
+
+        Arguments:
+            file_extensions {list} -- List of file extensions of backup
+                                      files to prune
+            **options {dict} -- Additional pruning options
+        """
+        options.setdefault('verbosity', 0)
+        Shears(self.tmp_path, file_extensions, **options).prune()
+
+    def create_files(self, start_date, num_files, extension, name_suffix='',
+                     subdir='daily'):
         """Create sequential backup files
 
+        Each set of backup files is only created once per test run (in
+        `self.templates_path`) and then hard linked into `subdir` of
+        every test that asks for it.
+
         Arguments:
             start_date {date} -- Starting date for the first backup file
             num_files {integer} -- Total number of backup files to create
@@ -21,23 +65,56 @@ class TestShears(unittest.TestCase):
         Keyword Arguments:
             name_suffix {string} -- Optional suffix to add to the filename
                                     (Default: '')
+            subdir {string} -- Directory within `self.tmp_path` to create
+                               the files in (Default: 'daily')
         """
         if extension[0] == '.':
             extension = extension[1:]
-        while num_files > 0:
-            filename = '{:04d}-{:02d}-{:02d}'.format(
-                start_date.year,
-                start_date.month,
-                start_date.day
+        key = (start_date, num_files, extension, name_suffix)
+        try:
+            template_path, filenames = self.templates[key]
+        except KeyError:
+            template_path = tempfile.mkdtemp(dir=self.templates_path)
+            suffix = f'_{name_suffix}' if name_suffix else ''
+            first_day = start_date.toordinal()
+            filenames = [
+                f'{date.fromordinal(day).isoformat()}{suffix}.{extension}'
+                for day in range(first_day, first_day + num_files)
+            ]
+            self.create_empty_files(
+                f'{template_path}{os.sep}{filename}' for filename in filenames
+            )
+            self.templates[key] = (template_path, filenames)
+        path = self.tmp_path
+        if subdir:
+            path = os.path.join(path, subdir)
+        for filename in filenames:
+            os.link(
+                f'{template_path}{os.sep}{filename}',
+                f'{path}{os.sep}{filename}',
             )
-            if name_suffix:
-                filename = '{}_{}'.format(filename, name_suffix)
-            filename = '{}.{}'.format(filename, extension)
-            open(os.path.join(self.tmp_path, 'daily', filename), 'a').close()
-            start_date = start_date + timedelta(days=1)
-            num_files -= 1
-
-    def create_folders(self, start_date, num_folders, name_suffix=''):
+
+    def create_empty_files(self, paths):
+        """Create an empty file at each of the `paths`
+
+        The files are created by a few threads at once since each one
+        is just a wait on the filesystem.
+
+        Arguments:
+            paths {iterable} -- Paths of the files to create
+        """
+        # create the empty files without the overhead of a file object
+        flags = os.O_WRONLY | os.O_CREAT
+
+        def touch(path):
+            os.close(os.open(path, flags, 0o644))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # consume the results so any error is raised here
+            list(executor.map(touch, paths))
+
+    def create_folders(self, start_date, num_folders, name_suffix='',
+                       subdir='daily'):
         """Create sequential backup folders
 
         Arguments:
@@ -47,52 +124,52 @@ class TestShears(unittest.TestCase):
         Keyword Arguments:
             name_suffix {string} -- Optional suffix to add to the folder name
                                     (Default: '')
+            subdir {string} -- Directory within `self.tmp_path` to create
+                               the folders in (Default: 'daily')
         """
-        while num_folders > 0:
-            folder_name = '{:04d}-{:02d}-{:02d}'.format(
-                start_date.year,
-                start_date.month,
-                start_date.day
-            )
-            if name_suffix:
-                folder_name = '{}_{}'.format(folder_name, name_suffix)
-            path = os.path.join(self.tmp_path, 'daily', folder_name)
+        parent_path = self.tmp_path
+        if subdir:
+            parent_path = os.path.join(parent_path, subdir)
+        suffix = f'_{name_suffix}' if name_suffix else ''
+        first_day = start_date.toordinal()
+        file_paths = []
+        for day in range(first_day, first_day + num_folders):
+            path = f'{parent_path}{os.sep}{date.fromordinal(day).isoformat()}'
+            path = f'{path}{suffix}'
             os.mkdir(path)
-            open(os.path.join(path, 'test.bak'), 'a').close()
-            open(os.path.join(path, 'test.log'), 'a').close()
-            open(os.path.join(path, 'test.tar.gz'), 'a').close()
-            open(os.path.join(path, 'test.zip'), 'a').close()
-            start_date = start_date + timedelta(days=1)
-            num_folders -= 1
+            file_paths.extend(f'{path}{os.sep}{name}' for name in FOLDER_FILES)
+        self.create_empty_files(file_paths)
+
+    @classmethod
+    def setUpClass(cls):
+        """Create a directory for the backup files shared by the tests
+
+        `cls.templates` maps the arguments of `create_files` to the
+        directory and names of the backup files it created
+        """
+        cls.templates = {}
+        cls.templates_path = tempfile.mkdtemp(prefix='shears_', dir=TMP_DIR)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Delete the shared backup files"""
+        shutil.rmtree(cls.templates_path, ignore_errors=True)
 
     def setUp(self):
         """Create a temporary directory structure to use for the pruning tests
 
-        A random character directory name will be created in the current
-        working directory and then four directories (daily, weekly, monthly,
-        and yearly) will be created within that directory.
+        A uniquely named directory will be created in the temporary
+        directory (see `TMP_DIR`) and then four directories (daily,
+        weekly, monthly, and yearly) will be created within that
+        directory.
 
-        `self.tmp_path` references the temporary directory path
+        `self.tmp_path` references the temporary directory path, which
+        is deleted along with everything it contains when the test ends
         """
-        while 2:
-            tmp_dir = uuid.uuid4().hex[:8]
-            self.tmp_path = os.path.join('.', tmp_dir)
-            if os.path.exists(self.tmp_path):
-                continue
-            os.makedirs(self.tmp_path)
-            break
+        self.tmp_path = tempfile.mkdtemp(prefix='shears_', dir=TMP_DIR)
+        self.addCleanup(shutil.rmtree, self.tmp_path, ignore_errors=True)
         for level in ('daily', 'weekly', 'monthly', 'yearly'):
-            path = os.path.join(self.tmp_path, level)
-            os.makedirs(path)
-
-    def tearDown(self):
-        """Delete the temporary directory and everything it contains"""
-        error_free = True
-        for error in self._outcome.errors:
-            if error[1] is not None:
-                error_free = False
-        if error_free:
-            shutil.rmtree(self.tmp_path, ignore_errors=True)
+            os.mkdir(os.path.join(self.tmp_path, level))
 
     def test_default(self):
         """Prune nine months of files that span the end of the year
@@ -102,10 +179,9 @@ class TestShears(unittest.TestCase):
         yearly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', 'test_backup')
-        shears = Shears(self.tmp_path, ['.bak', ], verbosity=0)
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.prune(['.bak', ])
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03_test_backup.bak',
                 '2018-08-04_test_backup.bak',
@@ -124,8 +200,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-23_test_backup.bak',
                 '2018-06-30_test_backup.bak',
@@ -136,8 +212,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-01-31_test_backup.bak',
                 '2018-02-28_test_backup.bak',
@@ -148,8 +224,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             ['2017-12-31_test_backup.bak', ],
             msg='Yearly files do not match the expected files'
         )
@@ -162,15 +238,12 @@ class TestShears(unittest.TestCase):
         yearly directories.
         """
         self.create_folders(date(2017, 11, 15), 275, 'backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['', ],
             folders=True,
-            verbosity=0,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03_backup',
                 '2018-08-04_backup',
@@ -189,8 +262,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily folders do not match the expected folders'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-23_backup',
                 '2018-06-30_backup',
@@ -201,8 +274,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly folders do not match the expected folders'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-01-31_backup',
                 '2018-02-28_backup',
@@ -213,35 +286,25 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly folders do not match the expected folders'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             ['2017-12-31_backup', ],
             msg='Yearly folders do not match the expected folders'
         )
 
     def test_directory__limit(self):
         """Prune 10 directories down to 6"""
-        self.create_folders(date(2017, 11, 15), 10)
-        for item in os.listdir(os.path.join(self.tmp_path, 'daily')):
-            src = os.path.join(self.tmp_path, 'daily', item)
-            dest = os.path.join(self.tmp_path, item)
-            os.rename(src, dest)
-        for folder in ['daily', 'weekly', 'monthly', 'yearly']:
-            shutil.rmtree(
-                os.path.join(self.tmp_path, folder),
-                ignore_errors=True
-            )
+        self.create_folders(date(2017, 11, 15), 10, subdir='')
+        for level in ('daily', 'weekly', 'monthly', 'yearly'):
+            os.rmdir(os.path.join(self.tmp_path, level))
 
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['', ],
             folders=True,
             limit=6,
-            verbosity=0,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(self.tmp_path)),
+        self.assertFilesEqual(
+            self.tmp_path,
             [
                 '2017-11-19',
                 '2017-11-20',
@@ -253,6 +316,43 @@ class TestShears(unittest.TestCase):
             msg='Remaining folders do not match the expected folders'
         )
 
+    def test_directory__limit_with_extension(self):
+        """Prune 10 directories and 10 files each down to 6"""
+        self.create_folders(date(2017, 11, 15), 10, subdir='')
+        self.create_files(
+            date(2017, 11, 20),
+            10,
+            '.bak',
+            'test_backup',
+            subdir='',
+        )
+        for level in ('daily', 'weekly', 'monthly', 'yearly'):
+            os.rmdir(os.path.join(self.tmp_path, level))
+
+        self.prune(
+            ['.bak', ],
+            folders=True,
+            limit=6,
+        )
+        self.assertFilesEqual(
+            self.tmp_path,
+            [
+                '2017-11-19',
+                '2017-11-20',
+                '2017-11-21',
+                '2017-11-22',
+                '2017-11-23',
+                '2017-11-24',
+                '2017-11-24_test_backup.bak',
+                '2017-11-25_test_backup.bak',
+                '2017-11-26_test_backup.bak',
+                '2017-11-27_test_backup.bak',
+                '2017-11-28_test_backup.bak',
+                '2017-11-29_test_backup.bak',
+            ],
+            msg='Remaining folders and files do not match the expected ones'
+        )
+
     def test_just_dates(self):
         """Prune nine months of files that just have dates for filenames
 
@@ -261,10 +361,9 @@ class TestShears(unittest.TestCase):
         yearly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', '')
-        shears = Shears(self.tmp_path, ['.bak ', ], verbosity=0)
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.prune(['.bak ', ])
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03.bak',
                 '2018-08-04.bak',
@@ -283,8 +382,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-23.bak',
                 '2018-06-30.bak',
@@ -295,8 +394,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-01-31.bak',
                 '2018-02-28.bak',
@@ -307,8 +406,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             ['2017-12-31.bak', ],
             msg='Yearly files do not match the expected files'
         )
@@ -321,10 +420,9 @@ class TestShears(unittest.TestCase):
         yearly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.tar.gz', '')
-        shears = Shears(self.tmp_path, ['tar.gz', ], verbosity=0)
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.prune(['tar.gz', ])
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03.tar.gz',
                 '2018-08-04.tar.gz',
@@ -343,8 +441,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-23.tar.gz',
                 '2018-06-30.tar.gz',
@@ -355,8 +453,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-01-31.tar.gz',
                 '2018-02-28.tar.gz',
@@ -367,8 +465,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             ['2017-12-31.tar.gz', ],
             msg='Yearly files do not match the expected files'
         )
@@ -385,18 +483,15 @@ class TestShears(unittest.TestCase):
             yearly: 2
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', 'test_backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['.bak', ],
-            verbosity=0,
             daily=20,
             weekly=4,
             monthly=3,
             yearly=2,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-07-28_test_backup.bak',
                 '2018-07-29_test_backup.bak',
@@ -421,8 +516,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-30_test_backup.bak',
                 '2018-07-07_test_backup.bak',
@@ -431,8 +526,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-03-31_test_backup.bak',
                 '2018-04-30_test_backup.bak',
@@ -440,8 +535,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             ['2017-12-31_test_backup.bak', ],
             msg='Yearly files do not match the expected files'
         )
@@ -453,16 +548,13 @@ class TestShears(unittest.TestCase):
         16 Aug 2018, and prunes them into daily and weekly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', 'test_backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['.bak', ],
-            verbosity=0,
             monthly=0,
             yearly=0,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03_test_backup.bak',
                 '2018-08-04_test_backup.bak',
@@ -481,8 +573,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-06-23_test_backup.bak',
                 '2018-06-30_test_backup.bak',
@@ -493,13 +585,13 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             [],
             msg='Yearly files do not match the expected files'
         )
@@ -515,18 +607,15 @@ class TestShears(unittest.TestCase):
         self.create_files(date(2017, 11, 15), 275, '.back.up', 'test_backup')
         self.create_files(date(2017, 11, 15), 275, '.tmp.bak', 'test_backup')
         self.create_files(date(2017, 11, 15), 275, '.tmp', 'test_backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['back.up', '.tmp.bak', 'tmp'],
-            verbosity=0,
             daily=7,
             weekly=2,
             monthly=2,
             yearly=2,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-10_test_backup.back.up',
                 '2018-08-10_test_backup.tmp',
@@ -552,8 +641,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [
                 '2018-07-28_test_backup.back.up',
                 '2018-07-28_test_backup.tmp',
@@ -564,8 +653,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-06-30_test_backup.back.up',
                 '2018-06-30_test_backup.tmp',
@@ -576,8 +665,64 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
+            [
+                '2017-12-31_test_backup.back.up',
+                '2017-12-31_test_backup.tmp',
+                '2017-12-31_test_backup.tmp.bak',
+            ],
+            msg='Yearly files do not match the expected files'
+        )
+
+    def test_multiple_extensions__parallel(self):
+        """Prune files with three different extensions in parallel
+
+        Same as `test_multiple_extensions` but the extensions at each
+        level are pruned at the same time.
+        """
+        self.create_files(date(2017, 11, 15), 275, '.back.up', 'test_backup')
+        self.create_files(date(2017, 11, 15), 275, '.tmp.bak', 'test_backup')
+        self.create_files(date(2017, 11, 15), 275, '.tmp', 'test_backup')
+        self.prune(
+            ['back.up', '.tmp.bak', 'tmp'],
+            daily=7,
+            weekly=2,
+            monthly=2,
+            yearly=2,
+            parallel=3,
+        )
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+            21,
+            msg='Daily files do not match the expected number of files'
+        )
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
+            [
+                '2018-07-28_test_backup.back.up',
+                '2018-07-28_test_backup.tmp',
+                '2018-07-28_test_backup.tmp.bak',
+                '2018-08-04_test_backup.back.up',
+                '2018-08-04_test_backup.tmp',
+                '2018-08-04_test_backup.tmp.bak',
+            ],
+            msg='Weekly files do not match the expected files'
+        )
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
+            [
+                '2018-06-30_test_backup.back.up',
+                '2018-06-30_test_backup.tmp',
+                '2018-06-30_test_backup.tmp.bak',
+                '2018-07-31_test_backup.back.up',
+                '2018-07-31_test_backup.tmp',
+                '2018-07-31_test_backup.tmp.bak',
+            ],
+            msg='Monthly files do not match the expected files'
+        )
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             [
                 '2017-12-31_test_backup.back.up',
                 '2017-12-31_test_backup.tmp',
@@ -593,18 +738,15 @@ class TestShears(unittest.TestCase):
         16 Aug 2018, and prunes them into daily and monthly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', 'test_backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['.bak', ],
-            verbosity=0,
             daily=14,
             weekly=0,
             monthly=6,
             yearly=0,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [
                 '2018-08-03_test_backup.bak',
                 '2018-08-04_test_backup.bak',
@@ -623,13 +765,13 @@ class TestShears(unittest.TestCase):
             ],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-02-28_test_backup.bak',
                 '2018-03-31_test_backup.bak',
@@ -640,8 +782,8 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             [],
             msg='Yearly files do not match the expected files'
         )
@@ -653,28 +795,25 @@ class TestShears(unittest.TestCase):
         16 Aug 2018, and prunes them into monthly directories.
         """
         self.create_files(date(2017, 11, 15), 275, '.bak', 'test_backup')
-        shears = Shears(
-            self.tmp_path,
+        self.prune(
             ['.bak', ],
-            verbosity=0,
             daily=0,
             weekly=0,
             monthly=6,
             yearly=0,
         )
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'daily'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'daily'),
             [],
             msg='Daily files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'weekly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'weekly'),
             [],
             msg='Weekly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'monthly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'monthly'),
             [
                 '2018-02-28_test_backup.bak',
                 '2018-03-31_test_backup.bak',
@@ -685,29 +824,27 @@ class TestShears(unittest.TestCase):
             ],
             msg='Monthly files do not match the expected files'
         )
-        self.assertListEqual(
-            sorted(os.listdir(os.path.join(self.tmp_path, 'yearly'))),
+        self.assertFilesEqual(
+            os.path.join(self.tmp_path, 'yearly'),
             [],
             msg='Yearly files do not match the expected files'
         )
 
     def test_limit_multipart_extension(self):
         """Prune 10 files with multipart extensions down to 6"""
-        self.create_files(date(2017, 11, 15), 10, '.tmp.bak', 'test_backup')
-        for item in os.listdir(os.path.join(self.tmp_path, 'daily')):
-            src = os.path.join(self.tmp_path, 'daily', item)
-            dest = os.path.join(self.tmp_path, item)
-            os.rename(src, dest)
-        for folder in ['daily', 'weekly', 'monthly', 'yearly']:
-            shutil.rmtree(
-                os.path.join(self.tmp_path, folder),
-                ignore_errors=True
-            )
+        self.create_files(
+            date(2017, 11, 15),
+            10,
+            '.tmp.bak',
+            'test_backup',
+            subdir='',
+        )
+        for level in ('daily', 'weekly', 'monthly', 'yearly'):
+            os.rmdir(os.path.join(self.tmp_path, level))
 
-        shears = Shears(self.tmp_path, [' tmp.bak ', ], verbosity=0, limit=6)
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(self.tmp_path)),
+        self.prune([' tmp.bak ', ], limit=6)
+        self.assertFilesEqual(
+            self.tmp_path,
             [
                 '2017-11-19_test_backup.tmp.bak',
                 '2017-11-20_test_backup.tmp.bak',
@@ -721,21 +858,19 @@ class TestShears(unittest.TestCase):
 
     def test_limit_only(self):
         """Prune 10 files down to 6"""
-        self.create_files(date(2017, 11, 15), 10, '.bak', 'test_backup')
-        for item in os.listdir(os.path.join(self.tmp_path, 'daily')):
-            src = os.path.join(self.tmp_path, 'daily', item)
-            dest = os.path.join(self.tmp_path, item)
-            os.rename(src, dest)
-        for folder in ['daily', 'weekly', 'monthly', 'yearly']:
-            shutil.rmtree(
-                os.path.join(self.tmp_path, folder),
-                ignore_errors=True
-            )
+        self.create_files(
+            date(2017, 11, 15),
+            10,
+            '.bak',
+            'test_backup',
+            subdir='',
+        )
+        for level in ('daily', 'weekly', 'monthly', 'yearly'):
+            os.rmdir(os.path.join(self.tmp_path, level))
 
-        shears = Shears(self.tmp_path, ['.bak', ], verbosity=0, limit=6)
-        shears.prune()
-        self.assertListEqual(
-            sorted(os.listdir(self.tmp_path)),
+        self.prune(['.bak', ], limit=6)
+        self.assertFilesEqual(
+            self.tmp_path,
             [
                 '2017-11-19_test_backup.bak',
                 '2017-11-20_test_backup.bak',
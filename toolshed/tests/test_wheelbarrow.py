@@ -1,12 +1,12 @@
-from datetime import datetime
-from subprocess import call
+from subprocess import call, check_output
+from unittest import mock
 
-from toolshed.wheelbarrow import Wheelbarrow
+from toolshed.wheelbarrow import CommandError, Wheelbarrow
 
 import os
 import shutil
+import tempfile
 import unittest
-import uuid
 
 
 class TestBucket(unittest.TestCase):
@@ -14,8 +14,9 @@ class TestBucket(unittest.TestCase):
     def create_dir(self, suffix=''):
         """Create a temporary directory to use for the tests
 
-        A random character directory name will be created in the current
-        working directory.
+        A uniquely named directory will be created in the system's
+        temporary directory and removed, with all of its contents, when
+        the test ends.
 
         KEYWORD ARGUMENTS:
             suffix {string} -- text to add to the end of the directory name
@@ -24,15 +25,11 @@ class TestBucket(unittest.TestCase):
         Returns:
             {string} -- complete path for the temporary directory
         """
-        while 2:
-            tmp_dir = uuid.uuid4().hex[:8]
-            if suffix:
-                tmp_dir = "{}_{}".format(tmp_dir, suffix)
-            tmp_path = os.path.join('.', tmp_dir)
-            if os.path.exists(tmp_path):
-                continue
-            os.makedirs(tmp_path)
-            return tmp_path
+        if suffix:
+            suffix = '_{}'.format(suffix)
+        path = tempfile.mkdtemp(suffix=suffix, dir=tempfile.gettempdir())
+        self.addCleanup(self.remove_dir, path)
+        return path
 
     def remove_dir(self, path):
         """Remove the directory and all of it's contents
@@ -42,6 +39,187 @@ class TestBucket(unittest.TestCase):
         """
         shutil.rmtree(path, ignore_errors=True)
 
+    def create_zeocluster(self, suffix=''):
+        """Create a small Plone `zeocluster` folder to back up
+
+        The folder holds a Data.fs and a
+        blob storage with a `.layout` file and one blob.
+
+        KEYWORD ARGUMENTS:
+            suffix {string} -- text to add to the end of the directory name
+                               (default: {''})
+
+        Returns:
+            {tuple} -- complete paths for the backup folder and the
+                       `zeocluster` folder
+        """
+        tmp_path = self.create_dir(suffix)
+        backup_path = os.path.join(tmp_path, 'backups')
+        plone_path = os.path.join(tmp_path, 'zeocluster')
+        os.makedirs(backup_path)
+        os.makedirs(os.path.join(plone_path, 'var', 'filestorage'))
+        os.makedirs(os.path.join(plone_path, 'var', 'blobstorage', 'tmp'))
+        self.write_file(plone_path, 'filestorage', 'Data.fs')
+        self.write_file(plone_path, 'blobstorage', '.layout')
+        self.write_file(plone_path, 'blobstorage', 'tmp', 'blob1')
+        return backup_path, plone_path
+
+    def write_file(self, plone_path, *names):
+        """Write a file in the `var` folder of a `zeocluster` folder
+
+        The file contains its own name.
+
+        Arguments:
+            plone_path {string} -- complete path to the `zeocluster` folder
+            names {string} -- path of the file within the `var` folder
+        """
+        filename = os.path.join(plone_path, 'var', *names)
+        with open(filename, 'w') as f:
+            f.write(filename)
+
+    def archive_files(self, filename):
+        """Return the names of the files in a tar archive
+
+        The archive is listed with tar itself as Python's tarfile module
+        misreads the folder entries of GNU incremental archives.
+
+        Arguments:
+            filename {string} -- complete path to the tar archive
+
+        Returns:
+            {list} -- Sorted names of the files (not folders) in the
+                      archive
+        """
+        names = check_output(['tar', '-tf', filename]).decode().splitlines()
+        return sorted(name for name in names if not name.endswith('/'))
+
+    def test_backup_combined_link(self):
+        """Ensure the combined backup links the Data.fs into the blobs"""
+        backup_path, plone_path = self.create_zeocluster('link')
+        src_file = os.path.join(plone_path, 'var', 'filestorage', 'Data.fs')
+        link_file = os.path.join(plone_path, 'var', 'blobstorage', 'Data.fs')
+        wheelbarrow = Wheelbarrow(backup_path, plone_path, verbosity=0)
+        wheelbarrow.copy_datafs()
+        self.assertTrue(
+            os.path.samefile(src_file, link_file),
+            msg='Data.fs was copied rather than linked'
+        )
+        wheelbarrow.backup_blob_storage()
+        self.assertFalse(
+            os.path.exists(link_file),
+            msg='Data.fs link was not removed from the blob storage'
+        )
+        self.assertEqual(
+            os.stat(src_file).st_nlink,
+            1,
+            msg='Data.fs is still linked'
+        )
+        filename = os.path.join(
+            backup_path, wheelbarrow.date_str + '.tar.gz'
+        )
+        self.assertListEqual(
+            self.archive_files(filename),
+            ['.layout', 'Data.fs', 'tmp/blob1'],
+            msg='Backup file does not contain the Plone data'
+        )
+
+    def test_backup_failure(self):
+        """Ensure a failing tar fails the backup and leaves no file"""
+        backup_path, plone_path = self.create_zeocluster('failure')
+        bin_path = os.path.abspath(
+            os.path.join(os.path.dirname(backup_path), 'bin')
+        )
+        os.makedirs(bin_path)
+        with open(os.path.join(bin_path, 'tar'), 'w') as f:
+            f.write('#!/bin/sh\ncat > /dev/null\necho partial\nexit 2\n')
+        os.chmod(os.path.join(bin_path, 'tar'), 0o755)
+        wheelbarrow = Wheelbarrow(
+            backup_path,
+            plone_path,
+            verbosity=0,
+            combined=False
+        )
+        path = bin_path + os.pathsep + os.environ.get('PATH', '')
+        with mock.patch.dict(os.environ, {'PATH': path}):
+            with self.assertRaises(CommandError):
+                wheelbarrow.backup()
+        self.assertListEqual(
+            os.listdir(backup_path),
+            [wheelbarrow.date_str + '_data.fs', ],
+            msg='Partial blob storage backup was not removed'
+        )
+
+    def test_backup_incremental(self):
+        """Ensure incremental backups only hold the changed blobs"""
+        backup_path, plone_path = self.create_zeocluster('incremental')
+        wheelbarrow = Wheelbarrow(
+            backup_path,
+            plone_path,
+            verbosity=0,
+            combined=False,
+            incremental=True
+        )
+        wheelbarrow.backup_blob_storage()
+        full_file = os.path.join(
+            backup_path,
+            wheelbarrow.date_str + '_blobstorage.full.tar.gz'
+        )
+        self.assertListEqual(
+            self.archive_files(full_file),
+            ['.layout', 'tmp/blob1'],
+            msg='Full backup does not contain the whole blob storage'
+        )
+        self.assertTrue(
+            os.path.isfile(os.path.join(backup_path, '.blobstorage.snar')),
+            msg='Blob storage snapshot was not created'
+        )
+
+        self.write_file(plone_path, 'blobstorage', 'tmp', 'blob2')
+        wheelbarrow = Wheelbarrow(
+            backup_path,
+            plone_path,
+            verbosity=0,
+            combined=False,
+            incremental=True
+        )
+        wheelbarrow.backup_blob_storage()
+        self.assertListEqual(
+            self.archive_files(os.path.join(
+                backup_path,
+                wheelbarrow.date_str + '_blobstorage.tar.gz'
+            )),
+            ['tmp/blob2', ],
+            msg='Incremental backup does not only contain the new blob'
+        )
+        self.assertListEqual(
+            sorted(os.listdir(backup_path)),
+            [
+                '.blobstorage.snar',
+                wheelbarrow.date_str + '_blobstorage.full.tar.gz',
+                wheelbarrow.date_str + '_blobstorage.tar.gz',
+            ],
+            msg='Backup folder does not only hold the backups and snapshot'
+        )
+
+    def test_backup_temporary_files(self):
+        """Ensure the backup files get their names once complete"""
+        backup_path, plone_path = self.create_zeocluster('temporary')
+        wheelbarrow = Wheelbarrow(
+            backup_path,
+            plone_path,
+            verbosity=0,
+            combined=False
+        )
+        wheelbarrow.backup()
+        self.assertListEqual(
+            sorted(os.listdir(backup_path)),
+            [
+                wheelbarrow.date_str + '_blobstorage.tar.gz',
+                wheelbarrow.date_str + '_data.fs',
+            ],
+            msg='Backup files do not match expected'
+        )
+
     def test_backup_combined(self):
         """Test backing up the Plone data into a single file"""
         tmp_path = self.create_dir('combined')
@@ -53,7 +231,7 @@ class TestBucket(unittest.TestCase):
         )
         wheelbarrow.backup()
 
-        backup_date = datetime.now().strftime("%Y-%m-%d")
+        backup_date = wheelbarrow.date_str
         self.assertTrue(
             os.path.isfile(os.path.join(tmp_path, backup_date + '.tar.gz')),
             msg='Backup file was not created'
@@ -76,7 +254,6 @@ class TestBucket(unittest.TestCase):
             'tmp' in os.listdir(backup_dir),
             msg='Backup of blob storage incomplete'
         )
-        self.remove_dir(tmp_path)
 
     def test_backup_separate(self):
         """Test backing up the Plone data into multiple files"""
@@ -89,7 +266,7 @@ class TestBucket(unittest.TestCase):
         )
         wheelbarrow.backup()
 
-        backup_date = datetime.now().strftime("%Y-%m-%d")
+        backup_date = wheelbarrow.date_str
         self.assertTrue(
             os.path.isfile(os.path.join(tmp_path, backup_date + '_data.fs')),
             msg='Backup Data.fs file was not created'
@@ -116,7 +293,6 @@ class TestBucket(unittest.TestCase):
             'Data.fs' in os.listdir(backup_dir),
             msg='Backup Data.fs file was in blob storage backup'
         )
-        self.remove_dir(tmp_path)
 
 
 if __name__ == '__main__':
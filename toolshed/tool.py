@@ -1,7 +1,9 @@
 from argparse import ArgumentParser
-from subprocess import call
+from threading import Lock
 
+import grp
 import os
+import pwd
 import sys
 
 
@@ -149,7 +151,7 @@ class BaseCommand(object):
 
     def print_help(self, prog_name, subcommand):
         """Print the help message for this command"""
-        parser = self.create_parser(prog_name, subcommand)
+        parser = self.create_parser(prog_name)
         parser.print_help()
 
     def run_from_argv(self, argv):
@@ -201,7 +203,13 @@ class BaseCommand(object):
 
 
 class Tool(object):
+    dryrun_prefix = ''
     verbosity = 1
+    write_lock = Lock()
+
+    # user/group name to id lookups shared by all tools
+    _group_ids = {}
+    _user_ids = {}
 
     def file_ownership_permissions(self, files, indent=4, permissions='440'):
         """Set the ownership and permissions of the files
@@ -215,42 +223,111 @@ class Tool(object):
                                 statements (default: {4})
             permissions {string} -- Unix permissions code to use
                                     (default: {'440'})
+
+        Raises:
+            CommandError -- If the owner or group does not exist or the
+                            permissions or ownership can't be set
         """
-        indent_str = ''
-        for i in range(indent):
-            indent_str += ' '
+        prefix = self.dryrun_prefix + ' ' * indent
 
         # fix the permissions on the backup files
-        self.write('{}{}Set file permissions to: {}'.format(
-            'DryRun: ' if self.dryrun else '',
-            indent_str,
-            permissions
-        ), verbosity=3)
-        if not self.dryrun:
-            for file in files:
-                call(['chmod', permissions, file])
+        self.write(
+            f'{prefix}Set file permissions to: {permissions}',
+            verbosity=3,
+        )
+
+        # the owner can be given the `chown` way, as OWNER[:GROUP], in
+        # which case its group wins over `self.file_group`
+        owner = self.file_owner
+        group = self.file_group
+        if owner is not None and ':' in owner:
+            owner, _, owner_group = owner.partition(':')
+            if owner_group:
+                group = owner_group
+            elif owner and not self.dryrun:
+                # `owner:` means the owner's login group
+                try:
+                    group = str(pwd.getpwnam(owner).pw_gid)
+                except KeyError:
+                    raise CommandError(f'Unknown user: {owner}')
+            owner = owner or None
 
         # update the file group of the backup files
-        if self.file_group is not None:
-            self.write('{}{}Update the file group to: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                indent_str,
-                self.file_group,
-            ), verbosity=3)
+        gid = -1
+        if group is not None:
+            self.write(
+                f'{prefix}Update the file group to: {group}',
+                verbosity=3,
+            )
             if not self.dryrun:
-                for file in files:
-                    call(['chgrp', self.file_group, file])
+                gid = self._group_id(group)
 
         # update the file ownership of the backup files
-        if self.file_owner is not None:
-            self.write('{}{}Update the file owner to: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                indent_str,
-                self.file_owner,
-            ), verbosity=3)
+        uid = -1
+        if owner is not None:
+            self.write(
+                f'{prefix}Update the file owner to: {owner}',
+                verbosity=3,
+            )
             if not self.dryrun:
-                for file in files:
-                    call(['chown', self.file_owner, file])
+                uid = self._user_id(owner)
+
+        if not self.dryrun:
+            mode = int(permissions, 8)
+            for file in files:
+                try:
+                    os.chmod(file, mode)
+                    if uid != -1 or gid != -1:
+                        os.chown(file, uid, gid)
+                except OSError as e:
+                    raise CommandError(
+                        f'Setting the permissions and ownership of {file} '
+                        f'failed: {e}'
+                    )
+
+    def _group_id(self, group):
+        """Return the numeric id of the `group` name (or id)
+
+        Arguments:
+            group {string} -- Group name or numeric group id
+
+        Returns:
+            {integer} -- Numeric group id
+
+        Raises:
+            CommandError -- If the group does not exist
+        """
+        if group not in self._group_ids:
+            try:
+                gid = grp.getgrnam(group).gr_gid
+            except KeyError:
+                if not str(group).isdigit():
+                    raise CommandError(f'Unknown group: {group}')
+                gid = int(group)
+            self._group_ids[group] = gid
+        return self._group_ids[group]
+
+    def _user_id(self, user):
+        """Return the numeric id of the `user` name (or id)
+
+        Arguments:
+            user {string} -- User name or numeric user id
+
+        Returns:
+            {integer} -- Numeric user id
+
+        Raises:
+            CommandError -- If the user does not exist
+        """
+        if user not in self._user_ids:
+            try:
+                uid = pwd.getpwnam(user).pw_uid
+            except KeyError:
+                if not str(user).isdigit():
+                    raise CommandError(f'Unknown user: {user}')
+                uid = int(user)
+            self._user_ids[user] = uid
+        return self._user_ids[user]
 
     def write(self, msg, end='\n', verbosity=1):
         """Output text to standard output
@@ -269,4 +346,5 @@ class Tool(object):
                                    output (default: {1})
         """
         if self.verbosity >= verbosity:
-            print(msg, end=end)
+            with self.write_lock:
+                print(msg, end=end)
@@ -1,16 +1,26 @@
 #!/usr/bin/env python
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from subprocess import call, CalledProcessError
+from subprocess import PIPE, Popen
 
 from tool import BaseCommand, CommandError, Tool
 
+import errno
 import os
 import shutil
 import sys
 
 
 class Wheelbarrow(Tool):
+    # errors from `os.copy_file_range` that mean to copy another way
+    _copy_file_range_errors = (
+        errno.EINVAL,
+        errno.ENOSYS,
+        errno.EOPNOTSUPP,
+        errno.EXDEV,
+    )
+
     def __init__(self, backup_path, plone_path, **options):
         """Plone backup tool
 
@@ -21,47 +31,64 @@ class Wheelbarrow(Tool):
         """
         self.backup_path = backup_path
         self.combined = options.get('combined', True)
+        self.compressor = options.get('compressor', 'gzip')
         self.dryrun = options.get('dryrun', False)
         self.file_group = options.get('file_group', None)
         self.file_owner = options.get('file_owner', None)
+        self.incremental = options.get('incremental', False)
         self.plone_path = plone_path
+        # absolute, as tar is run from within the blob storage
+        self.snapshot_path = os.path.abspath(
+            os.path.join(backup_path, '.blobstorage.snar')
+        )
         self.today = datetime.now()
         self.verbosity = options.get('verbosity', 1)
+        self.date_str = self.today.strftime('%Y-%m-%d')
+        self.dryrun_prefix = 'DryRun: ' if self.dryrun else ''
+        self.extension = 'tar.zst' if self.compressor == 'zstd' else 'tar.gz'
+        if self.incremental and not os.path.exists(self.snapshot_path):
+            # the full backup that the incremental ones are restored on
+            # top of gets its own extension so that pruning them (e.g.
+            # `*.tar.gz` with Shears) never removes it
+            self.extension = f'full.{self.extension}'
 
     def backup(self):
         """Backup the Plone data files"""
-        self.write('{}Plone backup for ({}) started on: {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            self.plone_path,
-            self.today.strftime("%-m/%-d/%Y %H:%M"),
-        ), verbosity=1)
-
-        # backup the data.fs file
-        self.write('{}Backing up the data.fs file'.format(
-            'DryRun: ' if self.dryrun else '',
-        ), verbosity=1)
-        self.copy_datafs()
-
-        # backup the blob storage files
-        self.write('{}Backing up the blob storage'.format(
-            'DryRun: ' if self.dryrun else '',
-        ), verbosity=1)
-        self.backup_blob_storage()
-
-        date_str = self.today.strftime('%Y-%m-%d')
+        started = self.today.strftime('%-m/%-d/%Y %H:%M')
+        self.write(
+            f'{self.dryrun_prefix}Plone backup for ({self.plone_path}) '
+            f'started on: {started}\n',
+            verbosity=1,
+        )
+
         if self.combined:
-            files = [
-                os.path.join(self.backup_path, '{}.tar.gz'.format(date_str)),
-            ]
+            # the Data.fs copy has to be in the blob storage before it
+            # can be tarred up with it
+            self.copy_datafs()
+            self.backup_blob_storage()
         else:
+            # the two backups share nothing, so run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                jobs = [
+                    executor.submit(self.copy_datafs),
+                    executor.submit(self.backup_blob_storage),
+                ]
+            for job in jobs:
+                job.result()
+
+        if self.combined:
             files = [
                 os.path.join(
                     self.backup_path,
-                    '{}_data.fs'.format(date_str)
+                    f'{self.date_str}.{self.extension}',
                 ),
+            ]
+        else:
+            files = [
+                os.path.join(self.backup_path, f'{self.date_str}_data.fs'),
                 os.path.join(
                     self.backup_path,
-                    '{}_blobstorage.tar.gz'.format(date_str)
+                    f'{self.date_str}_blobstorage.{self.extension}',
                 ),
             ]
 
@@ -69,40 +96,131 @@ class Wheelbarrow(Tool):
         self.file_ownership_permissions(files)
 
         # output the completion stats
-        self.write('\n{}Backup finished on {}\n'.format(
-            'DryRun: ' if self.dryrun else '',
-            datetime.now().strftime('%-m/%-d/%Y %H:%M'),
-        ), verbosity=1)
+        finished = datetime.now().strftime('%-m/%-d/%Y %H:%M')
+        self.write(
+            f'\n{self.dryrun_prefix}Backup finished on {finished}\n',
+            verbosity=1,
+        )
 
     def backup_blob_storage(self):
         """Backup the Plone blob storage by tarring the files"""
-        filename = '{}{}.tar.gz'.format(
-            self.today.strftime('%Y-%m-%d'),
-            '' if self.combined else '_blobstorage'
+        self.write(
+            f'{self.dryrun_prefix}Backing up the blob storage',
+            verbosity=1,
+        )
+        suffix = '' if self.combined else '_blobstorage'
+        filename = os.path.join(
+            self.backup_path,
+            f'{self.date_str}{suffix}.{self.extension}',
         )
-        filename = os.path.join(self.backup_path, filename)
         blob_path = os.path.join(self.plone_path, 'var', 'blobstorage')
-        cmd = 'tar -cz .layout *'
-        try:
-            self.write('{}    tar the blob storage directory to: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                filename,
-            ), verbosity=3)
-            if not self.dryrun:
-                with open(filename, 'wb') as out_file:
-                    call(cmd, shell=True, stdout=out_file, cwd=blob_path)
-        except CalledProcessError:
-            pass
-        else:
+        self.write(
+            f'{self.dryrun_prefix}    tar the blob storage directory '
+            f'to: {filename}',
+            verbosity=3,
+        )
+        if not self.dryrun:
+            # the .layout file plus what the shell's `*` would match,
+            # fed to tar on stdin so a `lawn` layout with a huge number
+            # of top level folders can't overflow the argument list
+            names = ['.layout']
+            with os.scandir(blob_path) as entries:
+                names.extend(sorted(
+                    entry.name for entry in entries
+                    if not entry.name.startswith('.')
+                ))
             if self.combined:
-                self.write('{}    Delete the Data.fs copy that was combined'.format(  # NOQA
-                    'DryRun: ' if self.dryrun else '',
-                ), verbosity=3)
-                if not self.dryrun:
-                    os.remove(os.path.join(blob_path, 'Data.fs'))
+                # read the (possibly linked, so live) Data.fs before the
+                # blobs so it never refers to a blob that isn't archived
+                names.remove('Data.fs')
+                names.insert(1, 'Data.fs')
+            cmd = [
+                'tar', '-c', self._compress_option(),
+                '--null', '-T', '-',
+            ]
+            snapshot = None
+            if self.incremental:
+                snapshot = self._snapshot_file()
+                cmd.append(f'--listed-incremental={snapshot}')
+            # write to a temporary name so nothing that picks up the
+            # backups (offsite copies, pruning) ever sees a partial file
+            partial = f'{filename}.tmp'
+            with open(partial, 'wb') as out_file:
+                tar = Popen(
+                    cmd,
+                    stdin=PIPE,
+                    stdout=out_file,
+                    cwd=blob_path,
+                )
+                tar.communicate(
+                    b''.join(os.fsencode(name) + b'\0' for name in names)
+                )
+                self._drop_cache(out_file)
+            if snapshot is not None and snapshot != self.snapshot_path:
+                os.remove(snapshot)
+            # exit code 1 only means a file changed while it was read
+            if tar.returncode not in (0, 1):
+                os.remove(partial)
+                if (snapshot == self.snapshot_path
+                        and os.path.exists(snapshot)):
+                    # the snapshot describes a backup that wasn't made
+                    os.remove(snapshot)
+                raise CommandError(
+                    'Backing up the blob storage failed (tar exit code: '
+                    f'{tar.returncode})'
+                )
+            os.replace(partial, filename)
+        if self.combined:
+            self.write(
+                f'{self.dryrun_prefix}    Delete the Data.fs copy that '
+                'was combined',
+                verbosity=3,
+            )
+            if not self.dryrun:
+                os.remove(os.path.join(blob_path, 'Data.fs'))
+
+    def _snapshot_file(self):
+        """Return the tar snapshot file for an incremental backup
+
+        Without a snapshot the backup is a full one that records the
+        state of the blob storage in `.blobstorage.snar`. Later backups work
+        from a copy of it, so each holds only the blobs changed since
+        that full backup and needs nothing else to be restored.
+
+        Returns:
+            {string} -- Path of the snapshot file for tar to use
+        """
+        if not os.path.exists(self.snapshot_path):
+            self.write(
+                '    No blob storage snapshot, making a full backup',
+                verbosity=3,
+            )
+            return self.snapshot_path
+        snapshot = f'{self.snapshot_path}.{self.date_str}'
+        shutil.copyfile(self.snapshot_path, snapshot)
+        return snapshot
+
+    def _compress_option(self):
+        """Return the tar option that compresses the blob storage
+
+        Both compressors are run on every core: zstd with `-T0` and gzip
+        by handing it to pigz when that is installed.
+
+        Returns:
+            {string} -- tar command line option
+        """
+        if self.compressor == 'zstd':
+            return '--use-compress-program=zstd -T0'
+        if shutil.which('pigz'):
+            return '--use-compress-program=pigz'
+        return '-z'
 
     def copy_datafs(self):
         """Copy the Plone data.fs file and prefix with the current date"""
+        self.write(
+            f'{self.dryrun_prefix}Backing up the data.fs file',
+            verbosity=1,
+        )
         datafs_path = os.path.join(self.plone_path, 'var', 'filestorage')
         src_file = os.path.join(datafs_path, 'Data.fs')
         if self.combined:
@@ -112,18 +230,117 @@ class Wheelbarrow(Tool):
                 'blobstorage',
                 'Data.fs'
             )
-            self.write('{}    Copying Data.fs to blob storage for combined backup'.format(  # NOQA
-                'DryRun: ' if self.dryrun else '',
-            ), verbosity=3)
+            self.write(
+                f'{self.dryrun_prefix}    Linking Data.fs into blob storage '
+                'for combined backup',
+                verbosity=3,
+            )
         else:
-            filename = '{}_data.fs'.format(self.today.strftime('%Y-%m-%d'))
-            dest_file = os.path.join(self.backup_path, filename)
-            self.write('{}    Copying Data.fs to: {}'.format(
-                'DryRun: ' if self.dryrun else '',
-                dest_file,
-            ), verbosity=3)
+            dest_file = os.path.join(
+                self.backup_path,
+                f'{self.date_str}_data.fs',
+            )
+            self.write(
+                f'{self.dryrun_prefix}    Copying Data.fs to: {dest_file}',
+                verbosity=3,
+            )
         if not self.dryrun:
-            shutil.copyfile(src_file, dest_file)
+            if self.combined and self._link_file(src_file, dest_file):
+                return
+            # as with the blob storage, only a complete copy is given the
+            # backup's name
+            partial = f'{dest_file}.tmp'
+            try:
+                self._copy_file(src_file, partial)
+            except OSError:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            if not self.combined:
+                # the combined copy is about to be read back by tar
+                with open(partial, 'rb') as copy:
+                    self._drop_cache(copy)
+            os.replace(partial, dest_file)
+
+    def _link_file(self, src_file, dest_file):
+        """Hard link `src_file` as `dest_file` instead of copying it
+
+        tar only needs to read the Data.fs for a combined backup, so a
+        second name for it saves reading and writing the whole file.
+
+        Arguments:
+            src_file {string} -- Path of the file to link to
+            dest_file {string} -- Path of the new link
+
+        Returns:
+            {boolean} -- Whether the link was made; if not (e.g. the
+                         paths are on different file systems) the file
+                         has to be copied
+        """
+        try:
+            if os.path.exists(dest_file):
+                # left behind by a backup that failed
+                os.remove(dest_file)
+            os.link(src_file, dest_file)
+        except OSError:
+            return False
+        return True
+
+    def _drop_cache(self, file):
+        """Write `file` to disk and drop it from the page cache
+
+        Backup files are not read again, so there is no reason to let
+        gigabytes of them push the Plone data out of memory.
+
+        Arguments:
+            file {file} -- Open file object of a finished backup file
+        """
+        if hasattr(os, 'posix_fadvise'):
+            # dirty pages can't be dropped until they have been written
+            os.fdatasync(file.fileno())
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _copy_file(self, src_file, dest_file):
+        """Copy the contents of `src_file` to `dest_file`
+
+        `os.copy_file_range` lets the kernel copy the data without it
+        passing through user space (or share it entirely on filesystems
+        that support reflinks), which matters for a multi-gigabyte
+        Data.fs. Falls back to `shutil.copyfile` where it isn't
+        available.
+
+        Arguments:
+            src_file {string} -- Path of the file to copy
+            dest_file {string} -- Path to copy the file to
+        """
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src_file, 'rb') as src:
+                    with open(dest_file, 'wb') as dest:
+                        self._copy_file_range(src, dest)
+                return
+            except OSError as e:
+                # not supported by this kernel or between these files
+                if e.errno not in self._copy_file_range_errors:
+                    raise
+        shutil.copyfile(src_file, dest_file)
+
+    def _copy_file_range(self, src, dest):
+        """Copy all of `src` to `dest` with `os.copy_file_range`
+
+        Arguments:
+            src {file} -- File object open for reading
+            dest {file} -- File object open for writing
+        """
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dest.fileno(), remaining)
+            if not copied:
+                # the source file shrank while it was being copied
+                break
+            remaining -= copied
 
 
 class Command(BaseCommand):
@@ -149,6 +366,14 @@ class Command(BaseCommand):
             help='Whether the Data.fs and blob storage should be combined '
                  'into a single backup file',
         )
+        parser.add_argument(
+            '--compressor',
+            action='store',
+            choices=['gzip', 'zstd'],
+            default='gzip',
+            dest='compressor',
+            help='Program used to compress the blob storage (default: gzip)',
+        )
         parser.add_argument(
             '-g', '--group',
             action='store',
@@ -156,12 +381,25 @@ class Command(BaseCommand):
             dest='file_group',
             help='Unix group who should own the backup files',
         )
+        parser.add_argument(
+            '-i', '--incremental',
+            action='store_true',
+            default=False,
+            dest='incremental',
+            help='Only back up the blobs changed since the last full blob '
+                 'storage backup. The full backup is named *.full.tar.gz '
+                 '(or *.full.tar.zst) and every later backup needs it to be '
+                 'restored, so don\'t prune it while they are kept. Delete '
+                 'the .blobstorage.snar file in the backup path to start '
+                 'over with a new full backup',
+        )
         parser.add_argument(
             '-o', '--owner',
             action='store',
             default=None,
             dest='file_owner',
-            help='Unix user who should own the backup files',
+            help='Unix user (or user:group) who should own the backup '
+                 'files',
         )
 
     def handle(self, *args, **options):